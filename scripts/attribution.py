@@ -0,0 +1,56 @@
+"""Multi-touch attribution over ordered touch paths.
+
+A path is the ordered list of marketing touches that led one lead to (maybe)
+an opportunity. Paths are stored flat, one ``lengths`` entry per path, and
+each path is credited under one attribution model. Credits within a path
+always sum to 1, so the rows for any opportunity add up to the whole deal.
+"""
+import numpy as np
+
+from segments import segment_positions, segment_sum
+
+ATTRIBUTION_MODELS = ['First Touch', 'Last Touch', 'Linear', 'Time Decay', 'Position Based']
+FIRST_TOUCH, LAST_TOUCH, LINEAR, TIME_DECAY, POSITION_BASED = range(len(ATTRIBUTION_MODELS))
+
+
+def attribute_touches(path_lengths, path_models, days_before_conversion,
+                      half_life_days=7.0, position_weights=(0.4, 0.2, 0.4)):
+    """
+    Credit every touch of every path under that path's model.
+
+    Args:
+        path_lengths: Number of touches in each path (all >= 1)
+        path_models: Model code per path (index into ATTRIBUTION_MODELS)
+        days_before_conversion: Per touch, days between the touch and the path's conversion
+        half_life_days: Time Decay half-life; a touch this much older gets half the weight
+        position_weights: Position Based (first, middle, last) shares; the middle share is
+            split evenly across middle touches, and paths without middle touches split
+            the whole credit between first and last in proportion
+
+    Returns:
+        np.ndarray: Credit per touch, summing to 1 within each path
+    """
+    path_lengths = np.asarray(path_lengths)
+    position = segment_positions(path_lengths)
+    length = np.repeat(path_lengths, path_lengths)
+    model = np.repeat(np.asarray(path_models), path_lengths)
+    first = position == 0
+    last = position == length - 1
+
+    decay = 0.5 ** (np.asarray(days_before_conversion, dtype=float) / half_life_days)
+    decay_credit = decay / np.repeat(segment_sum(decay, path_lengths), path_lengths)
+
+    first_share, middle_share, last_share = position_weights
+    middle_credit = middle_share / np.maximum(length - 2, 1)
+    position_credit = np.select(
+        [length == 1, (length == 2) & first, (length == 2) & last, first, last],
+        [1.0, first_share / (first_share + last_share), last_share / (first_share + last_share),
+         first_share, last_share],
+        default=middle_credit
+    )
+
+    return np.select(
+        [model == FIRST_TOUCH, model == LAST_TOUCH, model == LINEAR, model == TIME_DECAY],
+        [first.astype(float), last.astype(float), 1.0 / length, decay_credit],
+        default=position_credit
+    )
@@ -0,0 +1,71 @@
+"""Interned date strings for the generation window.
+
+Generated dates fall in a window of a few years around today, so a table
+with millions of date cells holds only a couple of thousand distinct
+values. ``DateStrings`` formats every day (and month) of the window once and
+turns formatting into an array gather, so each output cell references one
+shared string instead of a freshly formatted copy. Dates outside the window
+still format correctly, just without the lookup.
+"""
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+
+class DateStrings:
+    """
+    Day and month string tables covering ``first`` through ``last``.
+
+    Args:
+        first: First date of the window (date, ISO string or datetime64)
+        last: Last date of the window, inclusive
+    """
+
+    def __init__(self, first, last):
+        days = np.arange(np.datetime64(first, 'D'), np.datetime64(last, 'D') + 1)
+        months = np.arange(days[0].astype('datetime64[M]'), days[-1].astype('datetime64[M]') + 1)
+        self.first_day = int(days[0].astype(np.int64))
+        self.first_month = int(months[0].astype(np.int64))
+        self.day_table = np.array(np.datetime_as_string(days).tolist(), dtype=object)
+        self.month_table = np.array(np.datetime_as_string(months).tolist(), dtype=object)
+
+    def days(self, values):
+        """YYYY-MM-DD strings for datetime64 values or day numbers; NaT becomes ''."""
+        return self._gather(values, 'D', self.first_day, self.day_table)
+
+    def months(self, values):
+        """YYYY-MM strings for datetime64 values or month numbers (months since 1970-01)."""
+        return self._gather(values, 'M', self.first_month, self.month_table)
+
+    @staticmethod
+    def _gather(values, unit, first, table):
+        values = np.asarray(values)
+        if values.dtype.kind == 'M':
+            values = values.astype(f'datetime64[{unit}]').view(np.int64)
+        index = values.astype(np.int64) - first
+        inside = (index >= 0) & (index < len(table))
+        if inside.all():
+            return table[index]
+        formatted = np.empty(values.shape, dtype=object)
+        formatted[inside] = table[index[inside]]
+        outside = values[~inside].astype(np.int64).astype(f'datetime64[{unit}]')
+        formatted[~inside] = np.where(np.isnat(outside), '', np.datetime_as_string(outside))
+        return formatted
+
+
+@lru_cache(maxsize=None)
+def generation_calendar():
+    """Calendar shared by all generators: five years back through three years ahead of today."""
+    today = np.datetime64(date.today(), 'D')
+    return DateStrings(today - 5*366, today + 3*366)
+
+
+def format_dates(values):
+    """YYYY-MM-DD strings for datetime64 values or day numbers, via the shared calendar."""
+    return generation_calendar().days(values)
+
+
+def format_months(values):
+    """YYYY-MM strings for datetime64 values or month numbers, via the shared calendar."""
+    return generation_calendar().months(values)
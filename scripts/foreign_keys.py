@@ -0,0 +1,38 @@
+"""Sequential ids and foreign keys drawn from generated parent tables.
+
+Child tables that invent their references (``PAT{randint(1, 100):03d}``)
+only ever point at the first few parents once the parent table grows, and a
+fixed ``:03d`` pad stops sorting correctly past 999. Here ids are padded to
+the width of the largest id in their table, and foreign keys are sampled
+from the key column of the parent table that was actually generated, so
+references stay valid and cover every parent at any scale.
+"""
+import numpy as np
+
+
+def id_width(count, min_width=3):
+    """Digits needed to number ``count`` rows from 1, at least ``min_width``."""
+    return max(min_width, len(str(count)))
+
+
+def sequential_ids(prefix, count, min_width=3):
+    """Ids ``prefix`` + 1..count, zero-padded to one width so they sort in order."""
+    digits = np.char.zfill(np.arange(1, count + 1).astype(str), id_width(count, min_width))
+    return prefix + digits.astype(object)
+
+
+def sample_keys(rng, parent_keys, size):
+    """
+    ``size`` keys drawn uniformly (with replacement) from a parent key column.
+
+    ``rng`` is anything with a ``random(size)`` method: the ``np.random``
+    module or a ``Generator``.
+
+    Returns:
+        tuple: (keys as an array, row positions of the drawn keys in the parent)
+    """
+    parent_keys = np.asarray(parent_keys, dtype=object)
+    if len(parent_keys) == 0:
+        raise ValueError("Can't sample foreign keys from an empty parent table")
+    rows = (rng.random(size) * len(parent_keys)).astype(np.int64)
+    return parent_keys[rows], rows
@@ -1,11 +1,14 @@
-import pandas as pd
-import random
-from faker import Faker
+import argparse
+import numpy as np
 import os
+from calendar_strings import format_dates
+from output_writers import open_output, output_path, write_csv_columns
+from text_templates import corpus_pool
+from typed_table import today_day_number
 from datetime import datetime
 
-# Initialize Faker
-fake = Faker()
+# Initialize the random generator
+rng = np.random.default_rng(42)
 
 # Define paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,57 +26,77 @@ customer_types = ["New Customer", "Existing", "Returning"]
 products_services = ["SaaS Platform", "Consulting", "Hardware", "Cloud Services", "Training"]
 deal_priorities = ["High", "Medium", "Low"]
 
-# Generate mock data
-data = []
-for _ in range(1000):
-    customer_name = fake.company()
-    deal_value = round(random.uniform(5000, 100000), 2)  # Random deal value between $5,000 and $100,000
-    sales_stage = random.choice(sales_stages)
-    close_date = fake.date_between(start_date="-1y", end_date="today")
-    sales_rep = fake.name()
-    industry = random.choice(industries)
-    region = random.choice(regions)
-    lead_source = random.choice(lead_sources)
-    probability = random.randint(10, 100)  # Probability percentage
-    contract_length = random.randint(1, 36)  # Contract length in months
-    customer_size = random.randint(10, 1000)  # Number of employees
-    annual_revenue = round(random.uniform(1000000, 50000000), 2)  # Annual revenue in dollars
-    customer_type = random.choice(customer_types)
-    engagement_score = random.randint(0, 100)  # Engagement score
-    last_contact_date = fake.date_between(start_date="-6m", end_date="today")
-    next_follow_up_date = fake.date_between(start_date="today", end_date="+1m")
-    product_service = random.choice(products_services)
-    competitor_involved = random.choice(["Yes", "No"])
-    deal_priority = random.choice(deal_priorities)
-    notes_comments = fake.sentence()
-
-    # Append row to data
-    data.append([
-        customer_name, deal_value, sales_stage, close_date, sales_rep, industry, region,
-        lead_source, probability, contract_length, customer_size, annual_revenue,
-        customer_type, engagement_score, last_contact_date, next_follow_up_date,
-        product_service, competitor_involved, deal_priority, notes_comments
-    ])
-
-# Create DataFrame
+# Pooled identity values: deals are spread over at most this many customers and reps
+MAX_CUSTOMERS = 20000
+MAX_SALES_REPS = 500
+
 columns = [
     "Customer Name", "Deal Value", "Sales Stage", "Close Date", "Sales Rep", "Industry", "Region",
     "Lead Source", "Probability (%)", "Contract Length (Months)", "Customer Size (Employees)",
     "Annual Revenue ($)", "Customer Type", "Engagement Score", "Last Contact Date",
     "Next Follow-Up Date", "Product/Service", "Competitor Involved", "Deal Priority", "Notes/Comments"
 ]
-df = pd.DataFrame(data, columns=columns)
 
-# Generate file name with current date
-current_date = datetime.now()
-file_name = f"crm_data_{current_date.strftime('%m-%d')}.csv"
-output_path = os.path.join(output_dir, file_name)
 
-# Save to CSV
-df.to_csv(output_path, index=False)
+def pick(values, n):
+    """``n`` uniform draws from ``values`` as an object array."""
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def generate_crm_data(n_deals=1000, block_size=100_000, compression=None):
+    """
+    Generate CRM deals and stream them to crm_data_MM-DD.csv in blocks of ``block_size`` rows.
+
+    Returns:
+        str: Path of the written file
+    """
+    customer_pool = corpus_pool('company', size=min(n_deals, MAX_CUSTOMERS), seed=1)
+    sales_rep_pool = corpus_pool('name', size=min(n_deals, MAX_SALES_REPS), seed=2)
+    notes_pool = corpus_pool('sentence', seed=3)
+    today = today_day_number()
+
+    path = output_path(os.path.join(output_dir, f"crm_data_{datetime.now().strftime('%m-%d')}.csv"), compression)
+    with open_output(path, compression=compression) as f:
+        write_csv_columns(f, [[name] for name in columns], lineterminator='\n')
+        for start in range(0, n_deals, block_size):
+            n = min(block_size, n_deals - start)
+            block = [
+                customer_pool.sample_array(rng, n),
+                np.round(rng.uniform(5000, 100000, n), 2),  # Deal value between $5,000 and $100,000
+                pick(sales_stages, n),
+                format_dates(today - rng.integers(0, 366, n)),  # Close date in the past year
+                sales_rep_pool.sample_array(rng, n),
+                pick(industries, n),
+                pick(regions, n),
+                pick(lead_sources, n),
+                rng.integers(10, 101, n),  # Probability percentage
+                rng.integers(1, 37, n),  # Contract length in months
+                rng.integers(10, 1001, n),  # Number of employees
+                np.round(rng.uniform(1000000, 50000000, n), 2),  # Annual revenue in dollars
+                pick(customer_types, n),
+                rng.integers(0, 101, n),  # Engagement score
+                format_dates(today - rng.integers(0, 183, n)),  # Last contact in the past 6 months
+                format_dates(today + rng.integers(0, 31, n)),  # Follow-up within a month
+                pick(products_services, n),
+                pick(["Yes", "No"], n),
+                pick(deal_priorities, n),
+                notes_pool.sample_array(rng, n)
+            ]
+            write_csv_columns(f, block, lineterminator='\n')
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate CRM deal data")
+    parser.add_argument('--rows', type=int, default=1000, help="number of deals to generate")
+    parser.add_argument('--block-size', type=int, default=100_000, help="rows generated and written per block")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                        help="compress CSV output on a background thread pool")
+    args = parser.parse_args()
+    path = generate_crm_data(args.rows, args.block_size, args.compress)
 
-# Output file name
-print(f"Mock data generated and saved to {output_path}")
+    # Output file name
+    print(f"Mock data generated and saved to {path}")
 
-# Created/Modified files during execution:
-print(f"Created file: {output_path}")
\ No newline at end of file
+    # Created/Modified files during execution:
+    print(f"Created file: {path}")
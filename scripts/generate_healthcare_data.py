@@ -1,14 +1,50 @@
+import argparse
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import random
 from faker import Faker
 import os
+from calendar_strings import format_dates
+from foreign_keys import sample_keys, sequential_ids
+from output_writers import write_dataframe_csv
+from slot_calendar import SlotCalendar, hours_mask
+from text_templates import corpus_pool
 
 # Set up Faker and random seeds
 fake = Faker()
 np.random.seed(42)
 random.seed(42)
+rng = np.random.default_rng(42)
+
+# Pre-generated pool for free-text note columns
+note_pool = corpus_pool('text', max_nb_chars=100)
+
+# Command-line options
+parser = argparse.ArgumentParser(description="Generate healthcare data")
+parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                    help="compress CSV output on a background thread pool")
+parser.add_argument('--scale', type=float, default=1.0,
+                    help="multiply every table's row count (except the daily metrics) by this factor")
+args, _ = parser.parse_known_args()
+
+# Suppliers referenced by inventory and orders (there is no supplier table)
+N_SUPPLIERS = 10
+
+# 'HH:MM:SS' for every second of the day, gathered by index like the calendar strings
+CLOCK_TIMES = np.array([f'{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}' for s in range(86400)], dtype=object)
+
+# Bookable 30-minute slots of each shift: (slots on the shift's own day, slots after midnight
+# on the next day); rotating staff cycle through the three shifts week by week
+SHIFT_SLOTS = {
+    'Morning': (hours_mask(7, 15), 0),
+    'Afternoon': (hours_mask(15, 23), 0),
+    'Night': (hours_mask(23, 24), hours_mask(0, 7))
+}
+SHIFT_ROTATION = ['Morning', 'Afternoon', 'Night']
+
+# Staff roles that see patients by appointment
+APPOINTMENT_ROLES = ['Doctor', 'Specialist']
 
 # Get current date for directory naming
 current_date = datetime.now()
@@ -30,11 +66,12 @@ def generate_medical_staff(n_staff=50):
         'Specialist': ['Physiotherapist', 'Nutritionist', 'Psychologist', 'Radiologist', 'Anesthesiologist']
     }
 
+    staff_ids = sequential_ids('STF', n_staff)
     staff = []
     for i in range(n_staff):
         role = random.choice(roles)
         staff.append({
-            'staff_id': f'STF{i+1:03d}',
+            'staff_id': staff_ids[i],
             'name': fake.name(),
             'role': role,
             'specialization': random.choice(specializations[role]),
@@ -46,16 +83,18 @@ def generate_medical_staff(n_staff=50):
         })
     return pd.DataFrame(staff)
 
-def generate_patient_records(n_patients=100):
+def generate_patient_records(n_patients=100, staff_df=None):
     medical_conditions = ['Hypertension', 'Diabetes', 'Asthma', 'Arthritis', 'None', 'Heart Disease']
     allergies = ['Penicillin', 'Pollen', 'None', 'Latex', 'Peanuts', 'Shellfish']
 
+    patient_ids = sequential_ids('PAT', n_patients)
+    physicians, _ = sample_keys(rng, staff_df['staff_id'], n_patients)
     patients = []
     for i in range(n_patients):
         name = fake.name()
         email = f"{name.lower().replace(' ', '.')}{random.randint(1,999)}@{random.choice(['gmail.com', 'yahoo.com', 'hotmail.com'])}"
         patients.append({
-            'patient_id': f'PAT{i+1:03d}',
+            'patient_id': patient_ids[i],
             'name': name,
             'age': random.randint(18, 90),
             'gender': random.choice(['M', 'F']),
@@ -65,38 +104,59 @@ def generate_patient_records(n_patients=100):
             'date_of_birth': fake.date_of_birth(minimum_age=18, maximum_age=90),
             'medical_history': random.choice(medical_conditions),
             'allergies': random.choice(allergies),
-            'primary_physician': f'STF{random.randint(1,50):03d}',
+            'primary_physician': physicians[i],
             'insurance_provider': random.choice(['BlueCross', 'Aetna', 'UnitedHealth', 'Cigna', 'Medicare'])
         })
     return pd.DataFrame(patients)
 
+def shift_availability(shift_schedule, n_days):
+    """(staff x days) slot bitmaps of the hours each staff member works; night shifts run into the next morning."""
+    shift_schedule = np.asarray(shift_schedule)
+    shift_names = list(SHIFT_SLOTS)
+    same_day = np.array([SHIFT_SLOTS[shift][0] for shift in shift_names], dtype=np.uint64)
+    next_day = np.array([SHIFT_SLOTS[shift][1] for shift in shift_names], dtype=np.uint64)
+
+    # Shift each staff member works on every day of the window, plus the day before it
+    days = np.arange(-1, n_days)
+    rotation = np.array([shift_names.index(shift) for shift in SHIFT_ROTATION])
+    rotating = rotation[(np.arange(len(shift_schedule))[:, None] + days // 7) % len(SHIFT_ROTATION)]
+    fixed = np.array([shift_names.index(shift) if shift in SHIFT_SLOTS else 0 for shift in shift_schedule])
+    shift = np.where((shift_schedule == 'Rotating')[:, None], rotating, fixed[:, None])
+    return same_day[shift[:, 1:]] | next_day[shift[:, :-1]]
+
 def generate_appointments(n_appointments=500, patient_df=None, staff_df=None):
     appointment_types = ['Regular Checkup', 'Follow-up', 'Emergency', 'Consultation', 'Procedure']
     statuses = ['Scheduled', 'Completed', 'Cancelled', 'No-show']
 
-    appointments = []
-    for i in range(n_appointments):
-        patient_id = f'PAT{random.randint(1,100):03d}'
-        appointments.append({
-            'appointment_id': f'APT{i+1:03d}',
-            'patient_id': patient_id,
-            'doctor_id': f'STF{random.randint(1,50):03d}',
-            'appointment_date': fake.date_between(start_date='-30d', end_date='+30d'),
-            'appointment_time': fake.time(),
-            'status': random.choice(statuses),
-            'reason_for_visit': random.choice(appointment_types),
-            'follow_up_required': random.choice([True, False])
-        })
-    return pd.DataFrame(appointments)
+    # Book requested (provider, day) pairs into free slots of the provider's shifts, 30 days either side of today
+    providers = staff_df[staff_df['role'].isin(APPOINTMENT_ROLES)]
+    if providers.empty:
+        providers = staff_df
+    n_days = 61
+    first_day = np.datetime64(date.today(), 'D') - 30
+    calendar = SlotCalendar(shift_availability(providers['shift_schedule'], n_days))
+    provider, day, slot = calendar.schedule(rng, rng.integers(0, len(providers), n_appointments),
+                                            rng.integers(0, n_days, n_appointments))
+    return pd.DataFrame({
+        'appointment_id': sequential_ids('APT', n_appointments),
+        'patient_id': sample_keys(rng, patient_df['patient_id'], n_appointments)[0],
+        'doctor_id': providers['staff_id'].to_numpy()[provider],
+        'appointment_date': format_dates(first_day + day),
+        'appointment_time': CLOCK_TIMES[calendar.minutes(slot) * 60],
+        'status': rng.choice(statuses, n_appointments),
+        'reason_for_visit': rng.choice(appointment_types, n_appointments),
+        'follow_up_required': rng.random(n_appointments) < 0.5
+    })
 
 def generate_hospital_performance(n_days=30):
     metrics = []
     start_date = datetime.now() - timedelta(days=n_days)
+    metric_ids = sequential_ids('MET', n_days)
 
     for i in range(n_days):
         current_date = start_date + timedelta(days=i)
         metrics.append({
-            'metric_id': f'MET{i+1:03d}',
+            'metric_id': metric_ids[i],
             'date': current_date,
             'bed_occupancy_rate': round(random.uniform(0.60, 0.95), 2),
             'average_wait_time_minutes': random.randint(15, 120),
@@ -106,101 +166,106 @@ def generate_hospital_performance(n_days=30):
 
 def generate_pharmaceutical_inventory(n_items=100):
     categories = ['Medicine', 'Equipment', 'Supplies']
+    item_ids = sequential_ids('ITM', n_items)
+    suppliers, _ = sample_keys(rng, sequential_ids('SUP', N_SUPPLIERS), n_items)
     items = []
 
     for i in range(n_items):
         items.append({
-            'item_id': f'ITM{i+1:03d}',
+            'item_id': item_ids[i],
             'item_name': fake.word() + ' ' + random.choice(['Tablet', 'Injection', 'Syrup', 'Equipment', 'Supply']),
             'category': random.choice(categories),
             'quantity_in_stock': random.randint(0, 1000),
             'reorder_level': random.randint(50, 200),
-            'supplier_id': f'SUP{random.randint(1,10):03d}',
+            'supplier_id': suppliers[i],
             'expiration_date': fake.date_between(start_date='today', end_date='+2y'),
             'unit_price': round(random.uniform(10, 1000), 2)
         })
     return pd.DataFrame(items)
 
-def generate_billing_payments(n_bills=500):
-    bills = []
-
-    for i in range(n_bills):
-        total_amount = round(random.uniform(100, 5000), 2)
-        insurance_covered = round(total_amount * random.uniform(0.5, 0.9), 2)
-        bills.append({
-            'billing_id': f'BIL{i+1:03d}',
-            'patient_id': f'PAT{random.randint(1,100):03d}',
-            'appointment_id': f'APT{random.randint(1,500):03d}',
-            'total_amount': total_amount,
-            'insurance_covered_amount': insurance_covered,
-            'out_of_pocket_amount': round(total_amount - insurance_covered, 2),
-            'payment_status': random.choice(['Paid', 'Pending', 'Overdue']),
-            'payment_date': fake.date_between(start_date='-30d', end_date='today')
-        })
-    return pd.DataFrame(bills)
+def generate_billing_payments(n_bills=500, appointment_df=None):
+    # Each bill is for an existing appointment and charged to that appointment's patient
+    appointment_ids, rows = sample_keys(rng, appointment_df['appointment_id'], n_bills)
+    total_amount = np.round(rng.uniform(100, 5000, n_bills), 2)
+    insurance_covered = np.round(total_amount * rng.uniform(0.5, 0.9, n_bills), 2)
+    today = np.datetime64(date.today(), 'D')
+    return pd.DataFrame({
+        'billing_id': sequential_ids('BIL', n_bills),
+        'patient_id': appointment_df['patient_id'].to_numpy()[rows],
+        'appointment_id': appointment_ids,
+        'total_amount': total_amount,
+        'insurance_covered_amount': insurance_covered,
+        'out_of_pocket_amount': np.round(total_amount - insurance_covered, 2),
+        'payment_status': rng.choice(['Paid', 'Pending', 'Overdue'], n_bills),
+        'payment_date': format_dates(today - rng.integers(0, 31, n_bills))
+    })
 
 def generate_regulatory_compliance(n_records=20):
     departments = ['Emergency', 'Surgery', 'Pharmacy', 'Laboratory', 'General']
     audit_types = ['Safety', 'Documentation', 'Infection Control', 'Medicine Storage', 'Staff Training']
 
+    compliance_ids = sequential_ids('COM', n_records)
     compliance = []
     for i in range(n_records):
         compliance.append({
-            'compliance_id': f'COM{i+1:03d}',
+            'compliance_id': compliance_ids[i],
             'audit_date': fake.date_between(start_date='-60d', end_date='today'),
             'department': random.choice(departments),
             'audit_type': random.choice(audit_types),
-            'findings': fake.text(max_nb_chars=100),
-            'corrective_actions': fake.text(max_nb_chars=100),
+            'findings': note_pool.sample(),
+            'corrective_actions': note_pool.sample(),
             'status': random.choice(['Open', 'Closed', 'In Progress'])
         })
     return pd.DataFrame(compliance)
 
-def generate_patient_outcomes(n_outcomes=200):
+def generate_patient_outcomes(n_outcomes=200, patient_df=None):
     diagnoses = ['Hypertension', 'Diabetes', 'Respiratory Infection', 'Fracture', 'Anxiety']
     outcomes = ['Recovered', 'Improved', 'No Change', 'Deteriorated']
 
-    patient_outcomes = []
-    for i in range(n_outcomes):
-        start_date = fake.date_between(start_date='-60d', end_date='-30d')
-        patient_outcomes.append({
-            'outcome_id': f'OUT{i+1:03d}',
-            'patient_id': f'PAT{random.randint(1,100):03d}',
-            'treatment_id': f'TRT{i+1:03d}',
-            'diagnosis': random.choice(diagnoses),
-            'treatment_start_date': start_date,
-            'treatment_end_date': fake.date_between(start_date=start_date, end_date='today'),
-            'outcome': random.choice(outcomes),
-            'notes': fake.text(max_nb_chars=100)
-        })
-    return pd.DataFrame(patient_outcomes)
-
-def generate_supply_chain(n_orders=50):
-    orders = []
-    for i in range(n_orders):
-        quantity_ordered = random.randint(10, 100)
-        orders.append({
-            'order_id': f'ORD{i+1:03d}',
-            'supplier_id': f'SUP{random.randint(1,10):03d}',
-            'item_id': f'ITM{random.randint(1,100):03d}',
-            'order_date': fake.date_between(start_date='-30d', end_date='today'),
-            'delivery_date': fake.date_between(start_date='today', end_date='+30d'),
-            'quantity_ordered': quantity_ordered,
-            'quantity_received': random.randint(0, quantity_ordered),
-            'status': random.choice(['Ordered', 'In Transit', 'Delivered', 'Partially Delivered'])
-        })
-    return pd.DataFrame(orders)
+    # Treatment starts 30-60 days ago and ends between its start and today
+    today = np.datetime64(date.today(), 'D')
+    start_date = today - rng.integers(30, 61, n_outcomes)
+    end_date = start_date + (rng.random(n_outcomes) * (today - start_date + 1).astype(int)).astype(int)
+    return pd.DataFrame({
+        'outcome_id': sequential_ids('OUT', n_outcomes),
+        'patient_id': sample_keys(rng, patient_df['patient_id'], n_outcomes)[0],
+        'treatment_id': sequential_ids('TRT', n_outcomes),
+        'diagnosis': rng.choice(diagnoses, n_outcomes),
+        'treatment_start_date': format_dates(start_date),
+        'treatment_end_date': format_dates(end_date),
+        'outcome': rng.choice(outcomes, n_outcomes),
+        'notes': note_pool.sample_array(rng, n_outcomes)
+    })
+
+def generate_supply_chain(n_orders=50, inventory_df=None):
+    # Orders restock existing inventory items from the item's own supplier
+    item_ids, rows = sample_keys(rng, inventory_df['item_id'], n_orders)
+    quantity_ordered = rng.integers(10, 101, n_orders)
+    today = np.datetime64(date.today(), 'D')
+    return pd.DataFrame({
+        'order_id': sequential_ids('ORD', n_orders),
+        'supplier_id': inventory_df['supplier_id'].to_numpy()[rows],
+        'item_id': item_ids,
+        'order_date': format_dates(today - rng.integers(0, 31, n_orders)),
+        'delivery_date': format_dates(today + rng.integers(0, 31, n_orders)),
+        'quantity_ordered': quantity_ordered,
+        'quantity_received': (rng.random(n_orders) * (quantity_ordered + 1)).astype(int),
+        'status': rng.choice(['Ordered', 'In Transit', 'Delivered', 'Partially Delivered'], n_orders)
+    })
+
+def scaled(n):
+    return max(1, round(n * args.scale))
 
-# Generate all datasets
-staff_df = generate_medical_staff()
-patients_df = generate_patient_records()
-appointments_df = generate_appointments()
+# Generate all datasets, parents first so child tables reference real keys
+staff_df = generate_medical_staff(scaled(50))
+patients_df = generate_patient_records(scaled(100), staff_df)
+appointments_df = generate_appointments(scaled(500), patients_df, staff_df)
 performance_df = generate_hospital_performance()
-inventory_df = generate_pharmaceutical_inventory()
-billing_df = generate_billing_payments()
-compliance_df = generate_regulatory_compliance()
-outcomes_df = generate_patient_outcomes()
-supply_chain_df = generate_supply_chain()
+inventory_df = generate_pharmaceutical_inventory(scaled(100))
+billing_df = generate_billing_payments(scaled(500), appointments_df)
+compliance_df = generate_regulatory_compliance(scaled(20))
+outcomes_df = generate_patient_outcomes(scaled(200), patients_df)
+supply_chain_df = generate_supply_chain(scaled(50), inventory_df)
 
 # Save all datasets
 datasets = {
@@ -218,8 +283,7 @@ datasets = {
 # Save files and print information
 for name, df in datasets.items():
     filename = f'healthcare_data_{name}_{date_suffix}.csv'
-    filepath = os.path.join(output_dir, filename)
-    df.to_csv(filepath, index=False)
+    filepath = write_dataframe_csv(df, os.path.join(output_dir, filename), args.compress)
     print(f"\nDataset: {name}")
     print(f"Number of records: {len(df)}")
     print(f"Columns: {df.columns.tolist()}")
@@ -1,11 +1,15 @@
-import pandas as pd
-import random
-from faker import Faker
+import argparse
+import numpy as np
 import os
+from calendar_strings import format_dates
+from id_allocator import keyed_uuids
+from output_writers import open_output, output_path, write_csv_columns
+from text_templates import corpus_pool
+from typed_table import today_day_number
 from datetime import datetime
 
-# Initialize Faker
-fake = Faker()
+# Initialize the random generator
+rng = np.random.default_rng(42)
 
 # Define paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,58 +25,105 @@ incident_types = ["accident", "fire", "theft", "medical"]
 payment_methods = ["bank_transfer", "check", "credit_card"]
 adjuster_departments = ["auto_claims", "health_claims", "property_claims", "life_claims"]
 
-# Generate mock data
-data = []
-for _ in range(1000):
-    policy_holder_name = fake.name()
-    policy_id = fake.uuid4()
-    claim_id = fake.uuid4()
-    claim_date = fake.date_between(start_date="-1y", end_date="today").strftime("%Y-%m-%d")
-    claim_date_dt = datetime.strptime(claim_date, "%Y-%m-%d")
-    incident_date = fake.date_between(start_date="-2y", end_date=claim_date_dt).strftime("%Y-%m-%d")
-    claim_amount = round(random.uniform(500, 50000), 2)  # Claim amount between $500 and $50,000
-    approved_amount = round(random.uniform(0, claim_amount), 2)
-    claim_status = random.choice(claim_statuses)
-    policy_type = random.choice(policy_types)
-    incident_type = random.choice(incident_types)
-    incident_location = fake.address()
-    adjuster_name = fake.name()
-    adjuster_id = fake.uuid4()
-    adjuster_department = random.choice(adjuster_departments)
-    fraud_flag = random.choice(["yes", "no"])
-    deductible_amount = round(random.uniform(100, 5000), 2)
-    payout_amount = max(0, approved_amount - deductible_amount) if approved_amount > deductible_amount else 0
-    payment_date = fake.date_between(start_date=claim_date_dt, end_date="today").strftime("%Y-%m-%d") if payout_amount > 0 else "0000-00-00"
-    payment_method = random.choice(payment_methods) if payout_amount > 0 else "none"
-    notes = fake.sentence()
-
-    # Append row to data
-    data.append([
-        policy_holder_name, policy_id, claim_id, claim_date, incident_date, claim_amount, approved_amount,
-        claim_status, policy_type, incident_type, incident_location, adjuster_name, adjuster_id,
-        adjuster_department, fraud_flag, deductible_amount, payout_amount, payment_date,
-        payment_method, notes
-    ])
-
-# Create DataFrame
+# Pooled identity values: claims are filed against at most this many policies,
+# handled by at most this many adjusters; names and addresses come from fixed pools
+MAX_POLICIES = 10_000_000
+MAX_ADJUSTERS = 2000
+NAME_POOL_SIZE = 20000
+ADDRESS_POOL_SIZE = 20000
+
 columns = [
     "policy_holder_name", "policy_id", "claim_id", "claim_date", "incident_date", "claim_amount",
     "approved_amount", "claim_status", "policy_type", "incident_type", "incident_location",
     "adjuster_name", "adjuster_id", "adjuster_department", "fraud_flag", "deductible_amount",
     "payout_amount", "payment_date", "payment_method", "notes"
 ]
-df = pd.DataFrame(data, columns=columns)
 
-# Generate file name with current date
-current_date = datetime.now()
-file_name = f"insurance_claims_{current_date.strftime('%m-%d')}.csv"
-output_path = os.path.join(output_dir, file_name)
 
-# Save to CSV
-df.to_csv(output_path, index=False)
+def pick(values, n):
+    """``n`` uniform draws from ``values`` as an object array."""
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def generate_insurance_data(n_claims=1000, block_size=100_000, compression=None):
+    """
+    Generate insurance claims and stream them to insurance_claims_MM-DD.csv in blocks of ``block_size`` rows.
+
+    Policies and adjusters are drawn by index; the index fixes the holder or
+    adjuster name and (through ``keyed_uuids``) the UUID, so repeat claims on
+    a policy agree on both without a lookup table.
+
+    Returns:
+        str: Path of the written file
+    """
+    names = np.array(corpus_pool('name', size=NAME_POOL_SIZE, seed=1).values, dtype=object)
+    adjuster_names = np.array(corpus_pool('name', size=MAX_ADJUSTERS, seed=2).values, dtype=object)
+    address_pool = corpus_pool('address', size=min(n_claims, ADDRESS_POOL_SIZE), seed=3)
+    notes_pool = corpus_pool('sentence', seed=4)
+    n_policies = max(1, min(n_claims, MAX_POLICIES))
+    n_adjusters = max(1, min(n_claims, MAX_ADJUSTERS))
+    today = today_day_number()
+
+    path = output_path(os.path.join(output_dir, f"insurance_claims_{datetime.now().strftime('%m-%d')}.csv"),
+                       compression)
+    with open_output(path, compression=compression) as f:
+        write_csv_columns(f, [[name] for name in columns], lineterminator='\n')
+        for start in range(0, n_claims, block_size):
+            n = min(block_size, n_claims - start)
+            policy = rng.integers(0, n_policies, n)
+            adjuster = rng.integers(0, n_adjusters, n)
+
+            # Claim in the past year, incident up to two years back but not after the claim
+            claim_date = today - rng.integers(0, 366, n)
+            incident_date = rng.integers(today - 730, claim_date + 1)
+
+            claim_amount = np.round(rng.uniform(500, 50000, n), 2)  # Claim amount between $500 and $50,000
+            approved_amount = np.round(rng.uniform(0, claim_amount), 2)
+            deductible_amount = np.round(rng.uniform(100, 5000, n), 2)
+            payout_amount = np.round(np.maximum(approved_amount - deductible_amount, 0), 2)
+            paid = payout_amount > 0
+            payment_date = format_dates(rng.integers(claim_date, today + 1))
+            payment_date[~paid] = "0000-00-00"
+            payment_method = pick(payment_methods, n)
+            payment_method[~paid] = "none"
+
+            block = [
+                names[policy % len(names)],
+                keyed_uuids(policy, 'policy_id'),
+                keyed_uuids(np.arange(start, start + n), 'claim_id'),
+                format_dates(claim_date),
+                format_dates(incident_date),
+                claim_amount,
+                approved_amount,
+                pick(claim_statuses, n),
+                pick(policy_types, n),
+                pick(incident_types, n),
+                address_pool.sample_array(rng, n),
+                adjuster_names[adjuster],
+                keyed_uuids(adjuster, 'adjuster_id'),
+                pick(adjuster_departments, n),
+                pick(["yes", "no"], n),
+                deductible_amount,
+                payout_amount,
+                payment_date,
+                payment_method,
+                notes_pool.sample_array(rng, n)
+            ]
+            write_csv_columns(f, block, lineterminator='\n')
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate insurance claims data")
+    parser.add_argument('--rows', type=int, default=1000, help="number of claims to generate")
+    parser.add_argument('--block-size', type=int, default=100_000, help="rows generated and written per block")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                        help="compress CSV output on a background thread pool")
+    args = parser.parse_args()
+    path = generate_insurance_data(args.rows, args.block_size, args.compress)
 
-# Output file name
-print(f"Mock data generated and saved to {output_path}")
+    # Output file name
+    print(f"Mock data generated and saved to {path}")
 
-# Created/Modified files during execution:
-print(f"Created file: {output_path}")
+    # Created/Modified files during execution:
+    print(f"Created file: {path}")
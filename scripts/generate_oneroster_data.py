@@ -1,9 +1,12 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
 from faker import Faker
 import uuid
+from output_writers import write_dataframe_csv
+from id_allocator import IdAllocator
 
 np.random.seed(42)
 fake = Faker()
@@ -56,12 +59,13 @@ def generate_organizations(n):
         'identifier': fake.bothify(text='DIST-####'),
         'parent': ''
     })
+    school_codes = IdAllocator.for_count('SCH-', n - 1, 4, key='identifier').take(n - 1)
     for i in range(n - 1):
         orgs.append({
             'sourcedId': str(uuid.uuid4()),
             'name': fake.company() + " School",
             'type': 'school',
-            'identifier': fake.bothify(text='SCH-####'),
+            'identifier': school_codes[i],
             'parent': district_id
         })
     return pd.DataFrame(orgs)
@@ -69,7 +73,8 @@ def generate_organizations(n):
 def generate_users(n, org_ids):
     roles = ['student'] * 8 + ['teacher'] * 1 + ['admin']
     users = []
-    for _ in range(n):
+    user_codes = IdAllocator.for_count('U-', n, 5, key='userIds').take(n)
+    for i in range(n):
         role = np.random.choice(roles)
         org = np.random.choice(org_ids)
         users.append({
@@ -79,18 +84,19 @@ def generate_users(n, org_ids):
             'familyName': fake.last_name(),
             'role': role,
             'orgSourcedIds': org,
-            'userIds': fake.bothify(text='U-#####'),
+            'userIds': user_codes[i],
             'email': fake.email()
         })
     return pd.DataFrame(users)
 
 def generate_courses(n, org_ids):
     courses = []
-    for _ in range(n):
+    course_codes = IdAllocator.for_count('C-', n, 4, key='courseCode').take(n)
+    for i in range(n):
         courses.append({
             'sourcedId': str(uuid.uuid4()),
             'title': fake.catch_phrase(),
-            'courseCode': fake.bothify(text='C-####'),
+            'courseCode': course_codes[i],
             'orgSourcedId': np.random.choice(org_ids)
         })
     return pd.DataFrame(courses)
@@ -98,7 +104,8 @@ def generate_courses(n, org_ids):
 def generate_classes(n, course_ids, org_ids, session_ids):
     subjects = ['Math', 'Science', 'English', 'History', 'Art', 'Music', 'PE', 'Technology']
     classes = []
-    for _ in range(n):
+    class_codes = IdAllocator.for_count('CL-', n, 4, key='classCode').take(n)
+    for i in range(n):
         course = np.random.choice(course_ids)
         school = np.random.choice(org_ids)
         term = np.random.choice(session_ids)
@@ -109,7 +116,7 @@ def generate_classes(n, course_ids, org_ids, session_ids):
             'schoolSourcedId': school,
             'termSourcedIds': term,
             'subjects': np.random.choice(subjects),
-            'classCode': fake.bothify(text='CL-####')
+            'classCode': class_codes[i]
         })
     return pd.DataFrame(classes)
 
@@ -179,7 +186,7 @@ def generate_results(n, lineitem_ids, student_ids):
         })
     return pd.DataFrame(results)
 
-def main():
+def main(compression=None):
     print("Generating OneRoster datasets...")
 
     # Generate base tables
@@ -212,9 +219,12 @@ def main():
 
     for name, df in datasets.items():
         filename = f'oneroster__{name}_{datetime.now().strftime("%m-%d")}.csv'
-        df.to_csv(os.path.join(output_dir, filename), index=False)
+        write_dataframe_csv(df, os.path.join(output_dir, filename), compression)
 
     print(f"Data generation complete! Files saved to {output_dir}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate OneRoster data")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                        help="compress CSV output on a background thread pool")
+    main(parser.parse_args().compress)
\ No newline at end of file
@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime
+from id_allocator import IdAllocator
+from samplers import HierarchicalSampler
+from text_templates import fill_templates
 
 # Define the function to create the dataset
 def create_property_claims_dataset(num_records=100):
@@ -59,33 +62,39 @@ def create_property_claims_dataset(num_records=100):
 
     # Generate random data
     data = {
-        'claim_id': [f'CLM{np.random.randint(100000, 999999)}' for _ in range(num_records)],
-        'policyholder_id': [f'PH{np.random.randint(10000, 99999)}' for _ in range(num_records)],
+        'claim_id': IdAllocator.for_count('CLM', num_records, 6, key='claim_id').take(num_records),
+        'policyholder_id': IdAllocator.for_count('PH', num_records, 5, key='policyholder_id').take(num_records),
         'date_of_loss': [datetime(2025, np.random.randint(1, 4), np.random.randint(1, 29)).strftime('%Y-%m-%d') for _ in range(num_records)],
         'location_of_loss': [f'{np.random.randint(100, 999)} {np.random.choice(["Main", "Oak", "Elm", "Maple", "Pine"])} St, {np.random.choice(["Springfield", "Denver", "Miami", "Seattle", "Chicago", "Boston", "Atlanta"])}, {np.random.choice(["IL", "CO", "FL", "WA", "IL", "MA", "GA"])}' for _ in range(num_records)]
     }
 
+    # Parent -> child option tables, flattened once so each dependent column is one draw
+    subcategory_sampler = HierarchicalSampler({category: loss_subcategories[category] for category in loss_categories})
+    subcomponent_sampler = HierarchicalSampler({component: subcomponents[component] for component in components})
+    manufacturer_sampler = HierarchicalSampler({component: manufacturers[component] for component in components})
+
     # Generate loss categories and related fields
-    loss_category_list = np.random.choice(loss_categories, num_records)
-    data['loss_category'] = loss_category_list
+    loss_category_idx = np.random.randint(0, len(loss_categories), num_records)
+    data['loss_category'] = np.array(loss_categories)[loss_category_idx]
 
     # Generate subcategories based on the loss category
-    data['loss_subcategory'] = [np.random.choice(loss_subcategories[category]) for category in loss_category_list]
+    data['loss_subcategory'] = subcategory_sampler.sample(np.random, loss_category_idx)
 
     data['loss_mechanism'] = np.random.choice(loss_mechanisms, num_records)
     data['origin_of_failure'] = np.random.choice(origins_of_failure, num_records)
 
     # Generate components and related fields
-    component_list = np.random.choice(components, num_records)
-    data['component_of_failure'] = component_list
-
-    # Generate subcomponents based on the component
-    data['sub_component_of_failure'] = [np.random.choice(subcomponents[component]) for component in component_list]
+    component_idx = np.random.randint(0, len(components), num_records)
+    data['component_of_failure'] = np.array(components)[component_idx]
 
-    # Generate manufacturers based on the component
-    data['manufacturer_brand'] = [np.random.choice(manufacturers[component]) for component in component_list]
+    # Generate subcomponents and manufacturers based on the component
+    data['sub_component_of_failure'] = subcomponent_sampler.sample(np.random, component_idx)
+    manufacturer_idx = manufacturer_sampler.sample_indices(np.random, component_idx)
+    data['manufacturer_brand'] = manufacturer_sampler.children[manufacturer_idx]
 
-    data['model_serial_number'] = [f'{manufacturer[:2].upper()}-{np.random.randint(10000, 99999)}' for manufacturer in data['manufacturer_brand']]
+    # Serial prefix comes from the brand, computed once per brand rather than per row
+    brand_prefixes = np.array([brand[:2].upper() + '-' for brand in manufacturer_sampler.children], dtype=object)
+    data['model_serial_number'] = brand_prefixes[manufacturer_idx] + np.random.randint(10000, 99999, num_records).astype(str).astype(object)
 
     # Generate adjuster notes
     adjuster_notes_templates = [
@@ -96,15 +105,17 @@ def create_property_claims_dataset(num_records=100):
         "Property damaged by {subcategory} after {component} malfunction."
     ]
 
-    data['adjuster_notes'] = [
-        np.random.choice(adjuster_notes_templates).format(
-            subcategory=data['loss_subcategory'][i],
-            mechanism=data['loss_mechanism'][i],
-            origin=data['origin_of_failure'][i],
-            component=data['component_of_failure'][i],
-            subcomponent=data['sub_component_of_failure'][i]
-        ) for i in range(num_records)
-    ]
+    data['adjuster_notes'] = fill_templates(
+        adjuster_notes_templates,
+        np.random.randint(0, len(adjuster_notes_templates), num_records),
+        {
+            'subcategory': data['loss_subcategory'],
+            'mechanism': data['loss_mechanism'],
+            'origin': data['origin_of_failure'],
+            'component': data['component_of_failure'],
+            'subcomponent': data['sub_component_of_failure']
+        }
+    )
 
     # Generate financial and status fields
     data['estimated_loss_amount'] = [f"${np.random.randint(1000, 50000)}" for _ in range(num_records)]
@@ -113,29 +124,24 @@ def create_property_claims_dataset(num_records=100):
     data['subrogation_potential'] = subrogation_potential
 
     # Generate subrogation notes based on potential
-    subrogation_notes = []
-    for potential in subrogation_potential:
-        if potential == 'Yes':
-            notes = np.random.choice([
-                "Manufacturer defect identified.",
-                "Third-party liability established.",
-                "Faulty installation by contractor.",
-                "Product recall applicable.",
-                "Negligence by service provider."
-            ])
-        elif potential == 'Pending Review':
-            notes = np.random.choice([
-                "Awaiting expert inspection.",
-                "Investigating potential third-party liability.",
-                "Reviewing product warranty information.",
-                "Collecting additional evidence.",
-                "Consulting with legal department."
-            ])
-        else:  # No
-            notes = "No subrogation potential."
-        subrogation_notes.append(notes)
-
-    data['subrogation_notes'] = subrogation_notes
+    subrogation_notes_sampler = HierarchicalSampler({
+        'Yes': [
+            "Manufacturer defect identified.",
+            "Third-party liability established.",
+            "Faulty installation by contractor.",
+            "Product recall applicable.",
+            "Negligence by service provider."
+        ],
+        'Pending Review': [
+            "Awaiting expert inspection.",
+            "Investigating potential third-party liability.",
+            "Reviewing product warranty information.",
+            "Collecting additional evidence.",
+            "Consulting with legal department."
+        ],
+        'No': ["No subrogation potential."]
+    })
+    data['subrogation_notes'] = subrogation_notes_sampler.sample_for(np.random, subrogation_potential)
 
     data['preventable_loss'] = np.random.choice(['Yes', 'No'], num_records)
 
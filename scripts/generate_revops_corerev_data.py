@@ -1,36 +1,59 @@
+import argparse
 import os
-import csv
+from functools import partial
 import random
 from datetime import datetime, timedelta
+import numpy as np
 from faker import Faker
+import output_writers
+from samplers import CategoricalSampler
+from calendar_strings import format_dates
+from generation_state import GenerationState, format_state_date, parse_state_date
+from typed_table import NO_DATE, Table, today_day_number
 
 # Set up Faker and random seed for reproducibility
 fake = Faker()
 random.seed(42)
 Faker.seed(42)
+rng = np.random.default_rng(42)
+
+# Command-line options
+parser = argparse.ArgumentParser(description="Generate RevOps core revenue data")
+parser.add_argument('--incremental', action='store_true',
+                    help="append only new periods to output/revops_incremental instead of rebuilding a dated snapshot")
+parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                    help="compress CSV output on a background thread pool")
+parser.add_argument('--pipeline-granularity', choices=['day', 'hour'], default='day',
+                    help="time grain of the sales pipeline metrics table")
+parser.add_argument('--pipeline-segments', action='store_true',
+                    help="break sales pipeline metrics down by customer segment")
+args, _ = parser.parse_known_args()
 
 # Output directory
 today_str = datetime.now().strftime("%m-%d")
 script_dir = os.path.dirname(os.path.abspath(__file__))
-output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
+if args.incremental:
+    output_dir = os.path.join(script_dir, "../output/revops_incremental")
+else:
+    output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
 os.makedirs(output_dir, exist_ok=True)
 
-# Helper to write CSV
-def write_csv(subdomain, table_name, fieldnames, rows):
-    filename = f"{output_dir}/revops_{subdomain}_{table_name}.csv"
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    print(f"Wrote {filename} with {len(rows)} records")
+# Generator state for incremental runs (None for full rebuilds)
+state = GenerationState(os.path.join(output_dir, 'generator_state_core.json')) if args.incremental else None
+resuming = state is not None and state.run_number > 0
+if resuming:
+    # Fresh random stream per run so appended periods don't replay earlier ones
+    random.seed(42 + state.run_number)
+    Faker.seed(42 + state.run_number)
+    rng = np.random.default_rng(42 + state.run_number)
+
+# Table writers bound to this run's output directory and options
+write_csv_blocks = partial(output_writers.write_csv_blocks, output_dir,
+                           compression=args.compress)
 
-# Helper function to generate date ranges
-def date_range(start_date, end_date, step_days=1):
-    current = start_date
-    while current <= end_date:
-        yield current
-        current += timedelta(days=step_days)
+# Helper to write a typed table, formatting its values only here at the sink
+def write_table(subdomain, table_name, fieldnames, table):
+    return write_csv_blocks(subdomain, table_name, fieldnames, table.column_blocks(fieldnames))
 
 # 1. ACCOUNTS TABLE
 def generate_accounts(n=5000):
@@ -39,35 +62,35 @@ def generate_accounts(n=5000):
         'country', 'state', 'city', 'account_type', 'created_date', 'last_modified_date'
     ]
     
-    industries = ['Software', 'Finance', 'Healthcare', 'Retail', 'Manufacturing', 
-                 'Education', 'Real Estate', 'Media', 'Consulting', 'Technology']
+    industries = np.array(['Software', 'Finance', 'Healthcare', 'Retail', 'Manufacturing', 
+                           'Education', 'Real Estate', 'Media', 'Consulting', 'Technology'])
     account_types = ['Customer', 'Prospect', 'Partner', 'Reseller']
-    company_sizes = ['Small (1-50)', 'Medium (51-200)', 'Large (201-1000)', 'Enterprise (1000+)']
-    
-    rows = []
-    for i in range(1, n+1):
-        created = fake.date_between(start_date='-3y', end_date='today')
-        last_mod = fake.date_between(start_date=created, end_date='today')
-        
-        # Weight account types - more customers and prospects
-        account_type = random.choices(account_types, weights=[0.4, 0.35, 0.15, 0.1])[0]
-        
-        rows.append({
-            'account_id': i,
-            'account_name': fake.company(),
-            'industry': random.choice(industries),
-            'company_size': random.choice(company_sizes),
-            'annual_revenue': random.randint(500_000, 500_000_000),
-            'country': fake.country(),
-            'state': fake.state() if random.random() < 0.7 else '',  # 70% have state
-            'city': fake.city(),
-            'account_type': account_type,
-            'created_date': created.strftime('%Y-%m-%d'),
-            'last_modified_date': last_mod.strftime('%Y-%m-%d')
-        })
-    
-    write_csv('core', 'accounts', fieldnames, rows)
-    return rows
+    company_sizes = np.array(['Small (1-50)', 'Medium (51-200)', 'Large (201-1000)', 'Enterprise (1000+)'])
+    
+    # Weight account types - more customers and prospects
+    account_type_sampler = CategoricalSampler(account_types, weights=[0.4, 0.35, 0.15, 0.1])
+    
+    today = today_day_number()
+    created = rng.integers(today - 3*365, today + 1, n)
+    last_mod = rng.integers(created, today + 1)
+    has_state = rng.random(n) < 0.7  # 70% have state
+    
+    accounts = Table({
+        'account_id': np.arange(1, n + 1),
+        'account_name': [fake.company() for _ in range(n)],
+        'industry': industries[rng.integers(0, len(industries), n)],
+        'company_size': company_sizes[rng.integers(0, len(company_sizes), n)],
+        'annual_revenue': rng.integers(500_000, 500_000_001, n),
+        'country': [fake.country() for _ in range(n)],
+        'state': [fake.state() if has else '' for has in has_state],
+        'city': [fake.city() for _ in range(n)],
+        'account_type': account_type_sampler.sample_array(rng, n).astype(str),
+        'created_date': created,
+        'last_modified_date': last_mod
+    }, date_columns=['created_date', 'last_modified_date'])
+    
+    write_table('core', 'accounts', fieldnames, accounts)
+    return accounts
 
 # 2. CONTACTS TABLE
 def generate_contacts(accounts, avg_contacts_per_account=5):
@@ -76,45 +99,43 @@ def generate_contacts(accounts, avg_contacts_per_account=5):
         'job_title', 'department', 'seniority_level', 'created_date', 'last_activity_date'
     ]
     
-    departments = ['Sales', 'Marketing', 'IT', 'Finance', 'HR', 'Operations', 'Legal', 'Product']
-    seniority_levels = ['Entry', 'Senior', 'Manager', 'Director', 'VP', 'C-Level']
-    job_titles = ['Account Manager', 'Sales Director', 'Marketing Manager', 'IT Director', 
-                 'CFO', 'CEO', 'VP Sales', 'Product Manager', 'Operations Manager']
-    
-    rows = []
-    contact_id = 1
-    
-    for account in accounts:
-        # Vary number of contacts per account (1-10, weighted toward 3-7)
-        num_contacts = random.choices(range(1, 11), weights=[1,2,4,6,8,6,4,2,1,1])[0]
-        
-        for _ in range(num_contacts):
-            created = fake.date_between(
-                start_date=datetime.strptime(account['created_date'], '%Y-%m-%d').date(),
-                end_date='today'
-            )
-            last_activity = fake.date_between(start_date=created, end_date='today')
-            
-            first_name = fake.first_name()
-            last_name = fake.last_name()
-            
-            rows.append({
-                'contact_id': contact_id,
-                'account_id': account['account_id'],
-                'first_name': first_name,
-                'last_name': last_name,
-                'email': f"{first_name.lower()}.{last_name.lower()}@{fake.domain_name()}",
-                'phone': fake.phone_number(),
-                'job_title': random.choice(job_titles),
-                'department': random.choice(departments),
-                'seniority_level': random.choice(seniority_levels),
-                'created_date': created.strftime('%Y-%m-%d'),
-                'last_activity_date': last_activity.strftime('%Y-%m-%d')
-            })
-            contact_id += 1
-    
-    write_csv('core', 'contacts', fieldnames, rows)
-    return rows
+    departments = np.array(['Sales', 'Marketing', 'IT', 'Finance', 'HR', 'Operations', 'Legal', 'Product'])
+    seniority_levels = np.array(['Entry', 'Senior', 'Manager', 'Director', 'VP', 'C-Level'])
+    job_titles = np.array(['Account Manager', 'Sales Director', 'Marketing Manager', 'IT Director', 
+                           'CFO', 'CEO', 'VP Sales', 'Product Manager', 'Operations Manager'])
+    
+    # Vary number of contacts per account (1-10, weighted toward 3-7)
+    num_contacts_sampler = CategoricalSampler(range(1, 11), weights=[1,2,4,6,8,6,4,2,1,1])
+    
+    # Contacts are laid out account by account, so each account's contacts are contiguous
+    num_contacts = num_contacts_sampler.sample_indices(rng, len(accounts)) + 1
+    account_idx = np.repeat(np.arange(len(accounts)), num_contacts)
+    n = len(account_idx)
+    
+    # Contacts are created after their account, using its day number directly
+    today = today_day_number()
+    created = rng.integers(accounts['created_date'][account_idx], today + 1)
+    last_activity = rng.integers(created, today + 1)
+    
+    first_names = [fake.first_name() for _ in range(n)]
+    last_names = [fake.last_name() for _ in range(n)]
+    
+    contacts = Table({
+        'contact_id': np.arange(1, n + 1),
+        'account_id': accounts['account_id'][account_idx],
+        'first_name': first_names,
+        'last_name': last_names,
+        'email': [f"{first.lower()}.{last.lower()}@{fake.domain_name()}" for first, last in zip(first_names, last_names)],
+        'phone': [fake.phone_number() for _ in range(n)],
+        'job_title': job_titles[rng.integers(0, len(job_titles), n)],
+        'department': departments[rng.integers(0, len(departments), n)],
+        'seniority_level': seniority_levels[rng.integers(0, len(seniority_levels), n)],
+        'created_date': created,
+        'last_activity_date': last_activity
+    }, date_columns=['created_date', 'last_activity_date'])
+    
+    write_table('core', 'contacts', fieldnames, contacts)
+    return contacts
 
 # 3. LEADS TABLE
 def generate_leads(n=75000):
@@ -123,48 +144,44 @@ def generate_leads(n=75000):
         'job_title', 'lead_source', 'lead_status', 'created_date', 'converted_date', 'converted_contact_id'
     ]
     
-    lead_sources = ['Website', 'Event', 'Referral', 'Cold Call', 'Partner', 'Social Media', 
-                   'Email Campaign', 'Webinar', 'Trade Show', 'Content Download']
+    lead_sources = np.array(['Website', 'Event', 'Referral', 'Cold Call', 'Partner', 'Social Media', 
+                             'Email Campaign', 'Webinar', 'Trade Show', 'Content Download'])
     lead_statuses = ['New', 'Working', 'Qualified', 'Unqualified', 'Converted', 'Recycled']
     job_titles = ['Manager', 'Director', 'VP', 'Analyst', 'Coordinator', 'Specialist', 'Executive']
     
-    rows = []
-    converted_contact_counter = 1
-    
-    for i in range(1, n+1):
-        created = fake.date_between(start_date='-3y', end_date='today')
-        
-        # Weight lead statuses realistically
-        status = random.choices(lead_statuses, weights=[0.25, 0.30, 0.15, 0.20, 0.08, 0.02])[0]
-        
-        converted_date = ''
-        converted_contact_id = ''
-        
-        if status == 'Converted':
-            converted_date = fake.date_between(start_date=created, end_date='today').strftime('%Y-%m-%d')
-            converted_contact_id = converted_contact_counter
-            converted_contact_counter += 1
-        
-        first_name = fake.first_name()
-        last_name = fake.last_name()
-        
-        rows.append({
-            'lead_id': i,
-            'first_name': first_name,
-            'last_name': last_name,
-            'email': f"{first_name.lower()}.{last_name.lower()}@{fake.domain_name()}",
-            'phone': fake.phone_number(),
-            'company': fake.company(),
-            'job_title': f"{random.choice(job_titles)} {fake.job()}",
-            'lead_source': random.choice(lead_sources),
-            'lead_status': status,
-            'created_date': created.strftime('%Y-%m-%d'),
-            'converted_date': converted_date,
-            'converted_contact_id': converted_contact_id
-        })
-    
-    write_csv('core', 'leads', fieldnames, rows)
-    return rows
+    # Weight lead statuses realistically
+    status_sampler = CategoricalSampler(lead_statuses, weights=[0.25, 0.30, 0.15, 0.20, 0.08, 0.02])
+    
+    today = today_day_number()
+    created = rng.integers(today - 3*365, today + 1, n)
+    status = status_sampler.sample_array(rng, n).astype(str)
+    
+    # Converted leads get a conversion date and the next converted contact id
+    converted = status == 'Converted'
+    converted_date = np.where(converted, rng.integers(created, today + 1), NO_DATE)
+    converted_contact_id = np.full(n, '', dtype=object)
+    converted_contact_id[converted] = np.arange(1, int(converted.sum()) + 1)
+    
+    first_names = [fake.first_name() for _ in range(n)]
+    last_names = [fake.last_name() for _ in range(n)]
+    
+    leads = Table({
+        'lead_id': np.arange(1, n + 1),
+        'first_name': first_names,
+        'last_name': last_names,
+        'email': [f"{first.lower()}.{last.lower()}@{fake.domain_name()}" for first, last in zip(first_names, last_names)],
+        'phone': [fake.phone_number() for _ in range(n)],
+        'company': [fake.company() for _ in range(n)],
+        'job_title': [f"{random.choice(job_titles)} {fake.job()}" for _ in range(n)],
+        'lead_source': lead_sources[rng.integers(0, len(lead_sources), n)],
+        'lead_status': status,
+        'created_date': created,
+        'converted_date': converted_date,
+        'converted_contact_id': converted_contact_id
+    }, date_columns=['created_date', 'converted_date'])
+    
+    write_table('core', 'leads', fieldnames, leads)
+    return leads
 
 # 4. OPPORTUNITIES TABLE
 def generate_opportunities(accounts, contacts, n=15000):
@@ -174,97 +191,147 @@ def generate_opportunities(accounts, contacts, n=15000):
         'sales_rep_id', 'lead_source'
     ]
     
-    stages = ['Prospecting', 'Qualification', 'Proposal', 'Negotiation', 'Closed Won', 'Closed Lost']
-    stage_probabilities = {'Prospecting': 10, 'Qualification': 25, 'Proposal': 50, 
-                          'Negotiation': 75, 'Closed Won': 100, 'Closed Lost': 0}
-    lead_sources = ['Website', 'Event', 'Referral', 'Cold Call', 'Partner', 'Social Media']
+    stages = np.array(['Prospecting', 'Qualification', 'Proposal', 'Negotiation', 'Closed Won', 'Closed Lost'])
+    stage_probabilities = np.array([10, 25, 50, 75, 100, 0])  # By stages index
+    lead_sources = np.array(['Website', 'Event', 'Referral', 'Cold Call', 'Partner', 'Social Media'])
     
-    # Create sales reps
-    sales_reps = list(range(1, 51))  # 50 sales reps
-    
-    rows = []
-    
-    for i in range(1, n+1):
-        # Select random account and one of its contacts
-        account = random.choice(accounts)
-        account_contacts = [c for c in contacts if c['account_id'] == account['account_id']]
-        contact = random.choice(account_contacts) if account_contacts else None
-        
-        created = fake.date_between(start_date='-3y', end_date='today')
-        last_modified = fake.date_between(start_date=created, end_date='today')
-        
-        # Weight stages - more early stage opportunities
-        stage = random.choices(stages, weights=[0.3, 0.25, 0.2, 0.15, 0.07, 0.03])[0]
-        
-        # Close date logic
-        if stage in ['Closed Won', 'Closed Lost']:
-            close_date = fake.date_between(start_date=created, end_date='today').strftime('%Y-%m-%d')
-        else:
-            close_date = fake.date_between(start_date='today', end_date='+6m').strftime('%Y-%m-%d')
-        
-        # Amount varies by stage and account size
-        base_amount = random.randint(5000, 500000)
-        if 'Enterprise' in account.get('company_size', ''):
-            base_amount *= random.uniform(2, 5)
-        
-        rows.append({
-            'opportunity_id': i,
-            'account_id': account['account_id'],
-            'contact_id': contact['contact_id'] if contact else '',
-            'opportunity_name': f"{account['account_name']} - {fake.catch_phrase()}",
-            'stage': stage,
-            'amount': round(base_amount, 2),
-            'probability': stage_probabilities[stage],
-            'close_date': close_date,
-            'created_date': created.strftime('%Y-%m-%d'),
-            'last_modified_date': last_modified.strftime('%Y-%m-%d'),
-            'sales_rep_id': random.choice(sales_reps),
-            'lead_source': random.choice(lead_sources)
-        })
+    # Weight stages - more early stage opportunities
+    stage_sampler = CategoricalSampler(stages, weights=[0.3, 0.25, 0.2, 0.15, 0.07, 0.03])
     
-    write_csv('core', 'opportunities', fieldnames, rows)
-    return rows
+    # Create sales reps
+    n_sales_reps = 50
+    
+    # Select random account and one of its contacts; contacts are contiguous per
+    # account, so an account's contacts are a slice found by binary search
+    account_idx = rng.integers(0, len(accounts), n)
+    account_ids = accounts['account_id'][account_idx]
+    contact_accounts = contacts['account_id']
+    first_contact = np.searchsorted(contact_accounts, account_ids, side='left')
+    num_contacts = np.searchsorted(contact_accounts, account_ids, side='right') - first_contact
+    contact_idx = first_contact + (rng.random(n) * num_contacts).astype(np.int64)
+    contact_id = np.full(n, '', dtype=object)
+    has_contact = num_contacts > 0
+    contact_id[has_contact] = contacts['contact_id'][contact_idx[has_contact]]
+    
+    today = today_day_number()
+    created = rng.integers(today - 3*365, today + 1, n)
+    last_modified = rng.integers(created, today + 1)
+    
+    stage_idx = stage_sampler.sample_indices(rng, n)
+    
+    # Close date logic: closed deals closed after creation, open ones close in the next 6 months
+    closed = np.isin(stages[stage_idx], ['Closed Won', 'Closed Lost'])
+    close_date = np.where(closed, rng.integers(created, today + 1), rng.integers(today, today + 181, n))
+    
+    # Amount varies by stage and account size
+    base_amount = rng.integers(5000, 500001, n)
+    enterprise = np.char.find(accounts['company_size'][account_idx], 'Enterprise') >= 0
+    amount = np.where(enterprise, np.round(base_amount * rng.uniform(2, 5, n), 2), base_amount)
+    
+    account_names = accounts['account_name'][account_idx]
+    
+    opportunities = Table({
+        'opportunity_id': np.arange(1, n + 1),
+        'account_id': account_ids,
+        'contact_id': contact_id,
+        'opportunity_name': [f"{name} - {fake.catch_phrase()}" for name in account_names],
+        'stage': stages[stage_idx],
+        'amount': amount,
+        'probability': stage_probabilities[stage_idx],
+        'close_date': close_date,
+        'created_date': created,
+        'last_modified_date': last_modified,
+        'sales_rep_id': rng.integers(1, n_sales_reps + 1, n),
+        'lead_source': lead_sources[rng.integers(0, len(lead_sources), n)]
+    }, date_columns=['close_date', 'created_date', 'last_modified_date'])
+    
+    # Only enterprise amounts have cents; the others are written as whole dollars
+    written_amount = np.where(enterprise, amount.astype(object), base_amount.astype(object))
+    write_table('core', 'opportunities', fieldnames,
+                Table({**opportunities.columns, 'amount': written_amount}, opportunities.date_columns))
+    return opportunities
 
 # 5. SALES PIPELINE METRICS TABLE
-def generate_sales_pipeline_metrics():
+def generate_sales_pipeline_metrics(granularity='day', segments=None, block_days=30):
     fieldnames = [
         'pipeline_id', 'date', 'stage', 'conversion_rate', 'average_deal_size', 
         'deal_velocity_days', 'win_rate', 'loss_rate', 'pipeline_value'
     ]
+    if segments:
+        fieldnames.insert(3, 'segment')
+    
+    stages = np.array(['Prospecting', 'Qualification', 'Proposal', 'Negotiation', 'Closed Won', 'Closed Lost'])
     
-    stages = ['Prospecting', 'Qualification', 'Proposal', 'Negotiation', 'Closed Won', 'Closed Lost']
+    # Base conversion rates by stage
+    base_conversion = np.array([0.15, 0.35, 0.65, 0.80, 1.0, 0.0])
     
-    rows = []
     pipeline_id = 1
     
-    # Generate daily metrics for 3 years
+    # Generate daily (or hourly) metrics for 3 years
     start_date = datetime.now().date() - timedelta(days=3*365)
     end_date = datetime.now().date()
     
-    for current_date in date_range(start_date, end_date):
-        for stage in stages:
-            # Base conversion rates by stage
-            base_conversion = {'Prospecting': 0.15, 'Qualification': 0.35, 'Proposal': 0.65, 
-                             'Negotiation': 0.80, 'Closed Won': 1.0, 'Closed Lost': 0.0}
+    # Incremental runs continue from the day after the last one written
+    table_state = state.get('sales_pipeline_metrics') if state else None
+    if table_state:
+        # Appended rows must keep the columns and time grain of the existing file
+        saved_granularity = table_state.get('granularity', 'day')
+        saved_segments = table_state.get('segments')
+        if (saved_granularity, saved_segments) != (granularity, segments):
+            raise ValueError(
+                f"sales_pipeline_metrics was written with granularity={saved_granularity!r}, "
+                f"segments={saved_segments!r}; rerun with the same --pipeline-granularity and "
+                f"--pipeline-segments or start a fresh output directory")
+        start_date = parse_state_date(table_state['last_date']) + timedelta(days=1)
+        pipeline_id = table_state['next_pipeline_id']
+    
+    # Each period gets one row per (segment, stage); periods are formatted once, not per row
+    group_stage = np.tile(np.arange(len(stages)), len(segments) if segments else 1)
+    group_segment = np.repeat(np.array(segments or ['']), len(stages))
+    n_groups = len(group_stage)
+    n_days = max((end_date - start_date).days + 1, 0)
+    first_pipeline_id = pipeline_id
+    
+    def pipeline_blocks():
+        pipeline_id = first_pipeline_id
+        for first_day in range(0, n_days, block_days):
+            days = np.datetime64(start_date) + np.arange(first_day, min(first_day + block_days, n_days))
+            if granularity == 'hour':
+                periods = (days.astype('datetime64[h]')[:, None] + np.arange(24)).ravel()
+                labels = np.char.replace(np.datetime_as_string(periods, unit='s'), 'T', ' ')
+            else:
+                labels = format_dates(days)
+            n_rows = len(labels) * n_groups
+            stage_idx = np.tile(group_stage, len(labels))
             
-            conversion_rate = base_conversion[stage] + random.uniform(-0.05, 0.05)
-            conversion_rate = max(0, min(1, conversion_rate))  # Keep between 0 and 1
+            conversion_rate = np.clip(base_conversion[stage_idx] + rng.uniform(-0.05, 0.05, n_rows), 0, 1)
             
-            rows.append({
-                'pipeline_id': pipeline_id,
-                'date': current_date.strftime('%Y-%m-%d'),
-                'stage': stage,
-                'conversion_rate': round(conversion_rate, 3),
-                'average_deal_size': round(random.uniform(25000, 150000), 2),
-                'deal_velocity_days': random.randint(30, 180),
-                'win_rate': round(random.uniform(0.15, 0.35), 3),
-                'loss_rate': round(random.uniform(0.10, 0.25), 3),
-                'pipeline_value': round(random.uniform(500000, 5000000), 2)
-            })
-            pipeline_id += 1
-    
-    write_csv('core', 'sales_pipeline_metrics', fieldnames, rows)
-    return rows
+            columns = [
+                range(pipeline_id, pipeline_id + n_rows),
+                np.repeat(labels, n_groups).tolist(),
+                stages[stage_idx].tolist(),
+                np.round(conversion_rate, 3).tolist(),
+                np.round(rng.uniform(25000, 150000, n_rows), 2).tolist(),
+                rng.integers(30, 181, n_rows).tolist(),
+                np.round(rng.uniform(0.15, 0.35, n_rows), 3).tolist(),
+                np.round(rng.uniform(0.10, 0.25, n_rows), 3).tolist(),
+                np.round(rng.uniform(500000, 5000000, n_rows), 2).tolist()
+            ]
+            if segments:
+                columns.insert(3, np.tile(group_segment, len(labels)).tolist())
+            yield columns
+            pipeline_id += n_rows
+    
+    total = write_csv_blocks('core', 'sales_pipeline_metrics', fieldnames, pipeline_blocks(),
+                             append=table_state is not None)
+    if state:
+        state.set('sales_pipeline_metrics', {
+            'last_date': format_state_date(max(end_date, start_date - timedelta(days=1))),
+            'next_pipeline_id': first_pipeline_id + total,
+            'granularity': granularity,
+            'segments': segments
+        })
+    return total
 
 # 6. CUSTOMER LIFECYCLE DATA TABLE
 def generate_customer_lifecycle_data(accounts):
@@ -274,48 +341,34 @@ def generate_customer_lifecycle_data(accounts):
     ]
     
     lifecycle_stages = ['Lead', 'MQL', 'SQL', 'Opportunity', 'Customer', 'Advocate', 'Churned']
-    segments = ['SMB', 'Mid-Market', 'Enterprise', 'Strategic']
-    
-    rows = []
-    customer_id = 1
+    segments = np.array(['SMB', 'Mid-Market', 'Enterprise', 'Strategic'])
+    lifecycle_stage_sampler = CategoricalSampler(lifecycle_stages, weights=[0.05, 0.1, 0.1, 0.15, 0.5, 0.08, 0.02])
     
     # Only create lifecycle data for Customer accounts
-    customer_accounts = [acc for acc in accounts if acc['account_type'] == 'Customer']
-    
-    for account in customer_accounts:
-        acquisition_date = fake.date_between(
-            start_date=datetime.strptime(account['created_date'], '%Y-%m-%d').date(),
-            end_date='today'
-        )
-        
-        first_purchase = fake.date_between(start_date=acquisition_date, end_date='today')
-        
-        # Segment based on annual revenue
-        annual_rev = account['annual_revenue']
-        if annual_rev < 1_000_000:
-            segment = 'SMB'
-        elif annual_rev < 10_000_000:
-            segment = 'Mid-Market'
-        elif annual_rev < 100_000_000:
-            segment = 'Enterprise'
-        else:
-            segment = 'Strategic'
-        
-        rows.append({
-            'customer_id': customer_id,
-            'account_id': account['account_id'],
-            'lifecycle_stage': random.choices(lifecycle_stages, weights=[0.05, 0.1, 0.1, 0.15, 0.5, 0.08, 0.02])[0],
-            'acquisition_date': acquisition_date.strftime('%Y-%m-%d'),
-            'first_purchase_date': first_purchase.strftime('%Y-%m-%d'),
-            'ltv': round(random.uniform(10000, 500000), 2),
-            'acquisition_cost': round(random.uniform(1000, 25000), 2),
-            'segment': segment,
-            'risk_score': round(random.uniform(0, 100), 1)
-        })
-        customer_id += 1
-    
-    write_csv('core', 'customer_lifecycle_data', fieldnames, rows)
-    return rows
+    customer_accounts = accounts.select(accounts['account_type'] == 'Customer')
+    n = len(customer_accounts)
+    
+    today = today_day_number()
+    acquisition_date = rng.integers(customer_accounts['created_date'], today + 1)
+    first_purchase = rng.integers(acquisition_date, today + 1)
+    
+    # Segment based on annual revenue: <$1M SMB, <$10M Mid-Market, <$100M Enterprise, else Strategic
+    segment_idx = np.searchsorted([1_000_000, 10_000_000, 100_000_000], customer_accounts['annual_revenue'], side='right')
+    
+    lifecycle = Table({
+        'customer_id': np.arange(1, n + 1),
+        'account_id': customer_accounts['account_id'],
+        'lifecycle_stage': lifecycle_stage_sampler.sample_array(rng, n).astype(str),
+        'acquisition_date': acquisition_date,
+        'first_purchase_date': first_purchase,
+        'ltv': np.round(rng.uniform(10000, 500000, n), 2),
+        'acquisition_cost': np.round(rng.uniform(1000, 25000, n), 2),
+        'segment': segments[segment_idx],
+        'risk_score': np.round(rng.uniform(0, 100, n), 1)
+    }, date_columns=['acquisition_date', 'first_purchase_date'])
+    
+    write_table('core', 'customer_lifecycle_data', fieldnames, lifecycle)
+    return lifecycle
 
 # 7. REVENUE RECOGNITION DATA TABLE
 def generate_revenue_recognition_data(opportunities):
@@ -324,65 +377,73 @@ def generate_revenue_recognition_data(opportunities):
         'billing_date', 'billing_amount', 'collection_date', 'collection_amount', 'revenue_type'
     ]
     
-    revenue_types = ['New Business', 'Expansion', 'Renewal', 'Professional Services']
+    revenue_types = np.array(['New Business', 'Expansion', 'Renewal', 'Professional Services'])
     
-    rows = []
-    booking_id = 1
+    # Each opportunity might have multiple bookings (e.g., multi-year deals)
+    num_bookings_sampler = CategoricalSampler([1, 2, 3], weights=[0.7, 0.25, 0.05])
     
     # Only create revenue data for Closed Won opportunities
-    closed_won_opps = [opp for opp in opportunities if opp['stage'] == 'Closed Won']
-    
-    for opp in closed_won_opps:
-        # Each opportunity might have multiple bookings (e.g., multi-year deals)
-        num_bookings = random.choices([1, 2, 3], weights=[0.7, 0.25, 0.05])[0]
-        
-        for i in range(num_bookings):
-            booking_date = datetime.strptime(opp['close_date'], '%Y-%m-%d').date()
-            
-            # Billing typically happens same day or within 30 days
-            billing_date = booking_date + timedelta(days=random.randint(0, 30))
-            
-            # Collection typically happens 30-60 days after billing
-            collection_date = billing_date + timedelta(days=random.randint(30, 60))
-            
-            # Amount might be split across bookings
-            booking_amount = float(opp['amount']) / num_bookings
-            billing_amount = booking_amount * random.uniform(0.95, 1.0)  # Slight variation
-            collection_amount = billing_amount * random.uniform(0.98, 1.0)  # Account for discounts
-            
-            rows.append({
-                'booking_id': booking_id,
-                'opportunity_id': opp['opportunity_id'],
-                'booking_date': booking_date.strftime('%Y-%m-%d'),
-                'booking_amount': round(booking_amount, 2),
-                'billing_date': billing_date.strftime('%Y-%m-%d'),
-                'billing_amount': round(billing_amount, 2),
-                'collection_date': collection_date.strftime('%Y-%m-%d'),
-                'collection_amount': round(collection_amount, 2),
-                'revenue_type': random.choice(revenue_types)
-            })
-            booking_id += 1
-    
-    write_csv('core', 'revenue_recognition_data', fieldnames, rows)
-    return rows
+    closed_won_opps = opportunities.select(opportunities['stage'] == 'Closed Won')
+    num_bookings = num_bookings_sampler.sample_indices(rng, len(closed_won_opps)) + 1
+    n = int(num_bookings.sum())
+    
+    # Bookings land on the close date (already a day number, no parsing needed)
+    booking_date = np.repeat(closed_won_opps['close_date'], num_bookings)
+    
+    # Billing typically happens same day or within 30 days
+    billing_date = booking_date + rng.integers(0, 31, n)
+    
+    # Collection typically happens 30-60 days after billing
+    collection_date = billing_date + rng.integers(30, 61, n)
+    
+    # Amount might be split across bookings
+    booking_amount = np.repeat(closed_won_opps['amount'] / num_bookings, num_bookings)
+    billing_amount = booking_amount * rng.uniform(0.95, 1.0, n)  # Slight variation
+    collection_amount = billing_amount * rng.uniform(0.98, 1.0, n)  # Account for discounts
+    
+    revenue = Table({
+        'booking_id': np.arange(1, n + 1),
+        'opportunity_id': np.repeat(closed_won_opps['opportunity_id'], num_bookings),
+        'booking_date': booking_date,
+        'booking_amount': np.round(booking_amount, 2),
+        'billing_date': billing_date,
+        'billing_amount': np.round(billing_amount, 2),
+        'collection_date': collection_date,
+        'collection_amount': np.round(collection_amount, 2),
+        'revenue_type': revenue_types[rng.integers(0, len(revenue_types), n)]
+    }, date_columns=['booking_date', 'billing_date', 'collection_date'])
+    
+    write_table('core', 'revenue_recognition_data', fieldnames, revenue)
+    return revenue
 
 # MAIN EXECUTION FOR CORE REVENUE DATA
 def generate_core_revenue_data():
     print("Generating Core Revenue Data...")
     print("=" * 50)
     
-    # Generate in dependency order
-    accounts = generate_accounts(5000)
-    contacts = generate_contacts(accounts)
-    leads = generate_leads(75000)
-    opportunities = generate_opportunities(accounts, contacts, 15000)
-    sales_pipeline_metrics = generate_sales_pipeline_metrics()
-    customer_lifecycle_data = generate_customer_lifecycle_data(accounts)
-    revenue_recognition_data = generate_revenue_recognition_data(opportunities)
+    # Optional customer segment breakdown of the pipeline metrics (same segments as customer lifecycle)
+    pipeline_segments = ['SMB', 'Mid-Market', 'Enterprise', 'Strategic'] if args.pipeline_segments else None
+    
+    if resuming:
+        # Entity tables were written by the first incremental run; only extend the time series
+        sales_pipeline_metrics = generate_sales_pipeline_metrics(args.pipeline_granularity, pipeline_segments)
+    else:
+        # Generate in dependency order
+        accounts = generate_accounts(5000)
+        contacts = generate_contacts(accounts)
+        leads = generate_leads(75000)
+        opportunities = generate_opportunities(accounts, contacts, 15000)
+        sales_pipeline_metrics = generate_sales_pipeline_metrics(args.pipeline_granularity, pipeline_segments)
+        customer_lifecycle_data = generate_customer_lifecycle_data(accounts)
+        revenue_recognition_data = generate_revenue_recognition_data(opportunities)
+    
+    if state:
+        state.save()
     
     print("=" * 50)
     print("Core Revenue Data generation complete!")
     print(f"Output directory: {output_dir}")
 
 # Execute the generation
-generate_core_revenue_data()
\ No newline at end of file
+if __name__ == "__main__":
+    generate_core_revenue_data()
\ No newline at end of file
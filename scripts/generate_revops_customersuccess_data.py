@@ -1,37 +1,46 @@
+import argparse
 import os
-import csv
-import random
+from functools import partial
 from datetime import datetime, timedelta
-from faker import Faker
-import uuid
+import numpy as np
+import output_writers
+from samplers import CategoricalSampler
+from calendar_strings import format_dates, format_months
+from generation_state import GenerationState
+from random_walk import ragged_mask, random_walk, values_at
 
-# Set up Faker and random seed for reproducibility
-fake = Faker()
-random.seed(42)
-Faker.seed(42)
+# Seed the random generator for reproducibility
+rng = np.random.default_rng(42)
+
+# Command-line options
+parser = argparse.ArgumentParser(description="Generate RevOps customer success data")
+parser.add_argument('--incremental', action='store_true',
+                    help="append only new periods to output/revops_incremental instead of rebuilding a dated snapshot")
+parser.add_argument('--partitioned', nargs='?', const='csv', choices=['csv', 'parquet'],
+                    help="lay large time-series tables out as date=YYYY-MM partitions (csv or parquet)")
+parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                    help="compress CSV output on a background thread pool")
+args, _ = parser.parse_known_args()
 
 # Output directory
 today_str = datetime.now().strftime("%m-%d")
 script_dir = os.path.dirname(os.path.abspath(__file__))
-output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
+if args.incremental:
+    output_dir = os.path.join(script_dir, "../output/revops_incremental")
+else:
+    output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
 os.makedirs(output_dir, exist_ok=True)
 
-# Helper to write CSV
-def write_csv(subdomain, table_name, fieldnames, rows):
-    filename = f"{output_dir}/revops_{subdomain}_{table_name}.csv"
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    print(f"Wrote {filename} with {len(rows)} records")
+# Generator state for incremental runs (None for full rebuilds)
+state = GenerationState(os.path.join(output_dir, 'generator_state_success.json')) if args.incremental else None
+resuming = state is not None and state.run_number > 0
+if resuming:
+    # Fresh random stream per run so appended periods don't replay earlier ones
+    rng = np.random.default_rng(42 + state.run_number)
 
-# Helper function to generate date ranges
-def date_range(start_date, end_date, step_days=1):
-    current = start_date
-    while current <= end_date:
-        yield current
-        current += timedelta(days=step_days)
+# Table writers bound to this run's output directory and options
+write_csv_blocks = partial(output_writers.write_csv_blocks, output_dir,
+                           partitioned=args.partitioned, compression=args.compress)
 
 # 1. CUSTOMER HEALTH SCORES
 def generate_customer_health_scores(n_customers=4000):
@@ -40,306 +49,317 @@ def generate_customer_health_scores(n_customers=4000):
         'engagement_score', 'nps_score', 'overall_health_score'
     ]
     
-    rows = []
+    # Each score: (monthly drift step, observation noise, clip range)
+    score_walks = [
+        ('product_usage_score', 2, 15, (0, 100)),
+        ('support_score', 1, 10, (0, 100)),
+        ('engagement_score', 3, 20, (0, 100)),
+        ('nps_score', 5, 20, (-100, 100))
+    ]
+    
     health_id = 1
     
     # Generate monthly health scores for each customer
     start_date = datetime.now().date() - timedelta(days=3*365)
     end_date = datetime.now().date()
+    end_month = np.datetime64(end_date, 'M')
     
-    for customer_id in range(1, n_customers + 1):
-        # Customer start date (when they became a customer)
-        customer_start = fake.date_between(start_date=start_date, end_date=end_date)
-        
-        # Generate monthly scores from customer start to present
-        current_date = customer_start.replace(day=1)  # Start of month
+    # Incremental runs resume each customer's next month and drifting base scores
+    table_state = state.get('customer_health_scores') if state else None
+    if table_state:
+        health_id = table_state['next_health_id']
+        saved = [table_state['customers'][str(c)] for c in range(1, n_customers + 1)]
+        start_months = np.array([c['next_date'] for c in saved], dtype='datetime64[M]')
+        base_scores = np.array([c['base_scores'] for c in saved]).T
+    else:
+        # Customer start month (when they became a customer)
+        start_offsets = rng.integers(0, (end_date - start_date).days + 1, n_customers)
+        start_months = (np.datetime64(start_date) + start_offsets).astype('datetime64[M]')
         
         # Base scores that evolve over time
-        base_usage = random.uniform(40, 90)
-        base_support = random.uniform(60, 95)
-        base_engagement = random.uniform(30, 85)
-        base_nps = random.uniform(-50, 80)
-        
-        while current_date <= end_date:
-            # Scores drift over time with some randomness
-            usage_score = max(0, min(100, base_usage + random.uniform(-15, 15)))
-            support_score = max(0, min(100, base_support + random.uniform(-10, 10)))
-            engagement_score = max(0, min(100, base_engagement + random.uniform(-20, 20)))
-            nps_score = max(-100, min(100, base_nps + random.uniform(-20, 20)))
-            
-            # Overall health is weighted average
-            overall_health = round((usage_score * 0.3 + support_score * 0.2 + 
-                                 engagement_score * 0.3 + (nps_score + 100) * 0.5 * 0.2), 1)
-            
-            rows.append({
-                'health_id': health_id,
-                'customer_id': customer_id,
-                'date': current_date.strftime('%Y-%m-%d'),
-                'product_usage_score': round(usage_score, 1),
-                'support_score': round(support_score, 1),
-                'engagement_score': round(engagement_score, 1),
-                'nps_score': round(nps_score, 1),
-                'overall_health_score': overall_health
-            })
-            
-            health_id += 1
-            
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                # Use timedelta to safely move to next month
-                current_date = (current_date.replace(day=1) + timedelta(days=32)).replace(day=1)
-            
-            # Gradually evolve base scores
-            base_usage += random.uniform(-2, 2)
-            base_support += random.uniform(-1, 1)
-            base_engagement += random.uniform(-3, 3)
-            base_nps += random.uniform(-5, 5)
-    
-    write_csv('success', 'customer_health_scores', fieldnames, rows)
-    return rows
+        base_scores = np.vstack([
+            rng.uniform(40, 90, n_customers),
+            rng.uniform(60, 95, n_customers),
+            rng.uniform(30, 85, n_customers),
+            rng.uniform(-50, 80, n_customers)
+        ])
+    
+    # Monthly scores from each customer's start month to present, as a ragged
+    # (customers x months) grid; one extra column carries the post-drift base
+    # scores into the saved state
+    months_active = np.maximum((end_month - start_months).astype(int) + 1, 0)
+    width = int(months_active.max()) + 1 if n_customers else 1
+    active = ragged_mask(months_active, width)
+    n_rows = int(active.sum())
+    
+    scores = {}
+    next_base_scores = []
+    for (name, step, noise, (low, high)), base in zip(score_walks, base_scores):
+        walk = random_walk(rng, base, -step, step, width)
+        # Scores drift over time with some randomness
+        scores[name] = np.clip(walk[active] + rng.uniform(-noise, noise, n_rows), low, high)
+        next_base_scores.append(values_at(walk, months_active))
+    
+    # Overall health is weighted average
+    overall_health = (scores['product_usage_score'] * 0.3 + scores['support_score'] * 0.2 +
+                      scores['engagement_score'] * 0.3 + (scores['nps_score'] + 100) * 0.5 * 0.2)
+    
+    months = (start_months[:, None] + np.arange(width))[active]
+    columns = [
+        np.arange(health_id, health_id + n_rows),
+        np.repeat(np.arange(1, n_customers + 1), months_active),
+        format_dates(months),
+        *[np.round(scores[name], 1) for name, _, _, _ in score_walks],
+        np.round(overall_health, 1)
+    ]
+    health_id += n_rows
+    
+    total = write_csv_blocks('success', 'customer_health_scores', fieldnames, [columns],
+                             append=table_state is not None)
+    if state:
+        next_months = format_dates(start_months + months_active).tolist()
+        next_base_scores = np.vstack(next_base_scores).T.tolist()
+        state.set('customer_health_scores', {
+            'next_health_id': health_id,
+            'customers': {
+                str(customer_id): {'next_date': next_month, 'base_scores': bases}
+                for customer_id, next_month, bases in zip(range(1, n_customers + 1), next_months, next_base_scores)
+            }
+        })
+    return total
 
 # 2. CHURN AND RETENTION DATA
-def generate_churn_and_retention_data(n_customers=4000):
+def generate_churn_and_retention_data(n_customers=4000, block_size=1_000_000):
     fieldnames = [
         'retention_id', 'customer_id', 'cohort_month', 'months_retained', 
         'churned', 'churn_date', 'churn_reason', 'expansion_revenue', 'renewal_rate'
     ]
     
-    churn_reasons = ['Price', 'Product Fit', 'Competitor', 'Budget Cuts', 'Merger/Acquisition', 
-                    'Poor Support', 'Lack of Usage', 'Feature Gap', 'Contract End']
-    
-    rows = []
-    retention_id = 1
+    churn_reasons = np.array(['Price', 'Product Fit', 'Competitor', 'Budget Cuts', 'Merger/Acquisition', 
+                              'Poor Support', 'Lack of Usage', 'Feature Gap', 'Contract End'])
     
     # Generate cohort data
     start_date = datetime.now().date() - timedelta(days=3*365)
+    end_date = datetime.now().date()
+    end_month = np.datetime64(end_date, 'M')
     
-    for customer_id in range(1, n_customers + 1):
-        # Customer acquisition date
-        acquisition_date = fake.date_between(start_date=start_date, end_date='today')
-        cohort_month = acquisition_date.strftime('%Y-%m')
-        
-        # Determine if customer churned and when
-        churn_probability = random.uniform(0.05, 0.25)  # 5-25% annual churn rate
-        months_active = 0
-        current_date = acquisition_date
-        churned = False
-        churn_date = ''
-        churn_reason = ''
-        
-        # Track customer month by month
-        while current_date <= datetime.now().date() and not churned:
-            months_active += 1
+    def retention_blocks():
+        for first_customer in range(1, n_customers + 1, block_size):
+            customer_ids = np.arange(first_customer, min(first_customer + block_size, n_customers + 1))
+            n_block = len(customer_ids)
             
-            # Check for churn each month
-            monthly_churn_prob = churn_probability / 12
-            if random.random() < monthly_churn_prob and months_active > 3:  # No churn in first 3 months
-                churned = True
-                churn_date = current_date.strftime('%Y-%m-%d')
-                churn_reason = random.choice(churn_reasons)
-                break
+            # Customer acquisition date
+            acquisition_dates = np.datetime64(start_date) + rng.integers(0, (end_date - start_date).days + 1, n_block)
+            acquisition_months = acquisition_dates.astype('datetime64[M]')
             
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                # Use timedelta to safely move to next month
-                current_date = (current_date.replace(day=1) + timedelta(days=32)).replace(day=1)
-        
-        # Expansion revenue (for non-churned customers)
-        expansion_revenue = 0
-        if not churned and months_active > 6:
-            if random.random() < 0.3:  # 30% chance of expansion
-                expansion_revenue = round(random.uniform(5000, 50000), 2)
-        
-        # Renewal rate (for customers who had renewal opportunities)
-        renewal_rate = ''
-        if months_active >= 12:  # Had at least one renewal cycle
-            if churned:
-                renewal_rate = 0.0
-            else:
-                renewal_rate = round(random.uniform(0.8, 1.0), 3)
-        
-        rows.append({
-            'retention_id': retention_id,
-            'customer_id': customer_id,
-            'cohort_month': cohort_month,
-            'months_retained': months_active,
-            'churned': 'Yes' if churned else 'No',
-            'churn_date': churn_date,
-            'churn_reason': churn_reason,
-            'expansion_revenue': expansion_revenue,
-            'renewal_rate': renewal_rate
-        })
-        
-        retention_id += 1
+            # Customers are tracked month by month (acquisition month through the current
+            # month) with a constant monthly churn chance and no churn in the first 3
+            # months, so the churn month is 3 + a geometric draw, censored at today
+            churn_probability = rng.uniform(0.05, 0.25, n_block)  # 5-25% annual churn rate
+            months_tracked = (end_month - acquisition_months).astype(int) + 1
+            churn_month = 3 + rng.geometric(churn_probability / 12)
+            churned = churn_month <= months_tracked
+            months_active = np.where(churned, churn_month, months_tracked)
+            
+            # Churn is recorded on the first of the month it happens in
+            churn_dates = (acquisition_months + months_active - 1).astype('datetime64[D]')
+            churn_date = np.where(churned, format_dates(churn_dates), '')
+            churn_reason = np.where(churned, churn_reasons[rng.integers(0, len(churn_reasons), n_block)], '')
+            
+            # Expansion revenue (for non-churned customers): 30% chance after 6 months
+            expansion_revenue = np.zeros(n_block, dtype=object)
+            expanded = ~churned & (months_active > 6) & (rng.random(n_block) < 0.3)
+            expansion_revenue[expanded] = np.round(rng.uniform(5000, 50000, int(expanded.sum())), 2)
+            
+            # Renewal rate (for customers who had at least one renewal cycle)
+            renewal_rate = np.full(n_block, '', dtype=object)
+            renewed = ~churned & (months_active >= 12)
+            renewal_rate[churned & (months_active >= 12)] = 0.0
+            renewal_rate[renewed] = np.round(rng.uniform(0.8, 1.0, int(renewed.sum())), 3)
+            
+            yield [
+                customer_ids.tolist(),
+                customer_ids.tolist(),
+                format_months(acquisition_months).tolist(),
+                months_active.tolist(),
+                np.where(churned, 'Yes', 'No').tolist(),
+                churn_date.tolist(),
+                churn_reason.tolist(),
+                expansion_revenue.tolist(),
+                renewal_rate.tolist()
+            ]
     
-    write_csv('success', 'churn_and_retention', fieldnames, rows)
-    return rows
+    return write_csv_blocks('success', 'churn_and_retention', fieldnames, retention_blocks())
 
 # 3. PRODUCT USAGE ANALYTICS
-def generate_product_usage_analytics(n_customers=4000):
+def generate_product_usage_analytics(n_customers=4000, block_size=500):
     fieldnames = [
         'usage_id', 'customer_id', 'date', 'feature_name', 'usage_count', 
         'session_duration', 'user_count', 'adoption_stage'
     ]
     
-    features = ['Dashboard', 'Reports', 'API', 'Integrations', 'Mobile App', 
-               'Advanced Analytics', 'Collaboration', 'Automation', 'Custom Fields', 'Export']
-    adoption_stages = ['Trial', 'Basic', 'Intermediate', 'Advanced', 'Power User']
+    features = np.array(['Dashboard', 'Reports', 'API', 'Integrations', 'Mobile App', 
+                         'Advanced Analytics', 'Collaboration', 'Automation', 'Custom Fields', 'Export'])
+    adoption_stages = np.array(['Trial', 'Basic', 'Intermediate', 'Advanced', 'Power User'])
     
-    rows = []
-    usage_id = 1
+    # Lookup tables indexed by adoption stage
+    feature_count_ranges = np.array([[1, 3], [2, 5], [4, 7], [6, 9], [10, 10]])  # Features used
+    max_usage_counts = np.array([2, 5, 12, 25, 50])
+    max_user_counts = np.array([3, 3, 3, 10, 10])  # Multi-user accounts for Advanced/Power User
+    
+    # Session duration ranges in seconds, indexed by feature
+    duration_ranges = np.array([
+        [300, 3600] if feature in ('Dashboard', 'Reports')  # 5-60 minutes
+        else [60, 600] if feature in ('API', 'Integrations')  # 1-10 minutes
+        else [120, 1800]  # 2-30 minutes
+        for feature in features
+    ])
     
     # Generate daily usage data (sample - not all days for all customers to keep manageable)
     start_date = datetime.now().date() - timedelta(days=365)  # Last year only
     end_date = datetime.now().date()
+    n_window_days = (end_date - start_date).days + 1
     
-    for customer_id in range(1, n_customers + 1):
-        # Customer's adoption stage
-        customer_adoption = random.choice(adoption_stages)
-        
-        # Features used based on adoption stage
-        if customer_adoption == 'Trial':
-            active_features = random.sample(features, random.randint(1, 3))
-        elif customer_adoption == 'Basic':
-            active_features = random.sample(features, random.randint(2, 5))
-        elif customer_adoption == 'Intermediate':
-            active_features = random.sample(features, random.randint(4, 7))
-        elif customer_adoption == 'Advanced':
-            active_features = random.sample(features, random.randint(6, 9))
-        else:  # Power User
-            active_features = features
-        
-        # Generate usage data for random days (not every day)
-        usage_days = random.randint(50, 300)  # 50-300 days of usage in the year
-        
-        for _ in range(usage_days):
-            usage_date = fake.date_between(start_date=start_date, end_date=end_date)
+    def usage_blocks():
+        usage_id = 1
+        for first_customer in range(1, n_customers + 1, block_size):
+            customer_ids = np.arange(first_customer, min(first_customer + block_size, n_customers + 1))
+            n_block = len(customer_ids)
+            
+            # Customer's adoption stage and the features it uses
+            stages = rng.integers(0, len(adoption_stages), n_block)
+            low, high = feature_count_ranges[stages].T
+            n_active = rng.integers(low, high + 1)
+            feature_ranks = rng.random((n_block, len(features))).argsort(axis=1).argsort(axis=1)
+            active_features = feature_ranks < n_active[:, None]
+            
+            # Usage data for random days (not every day): 50-300 days of usage in the year
+            usage_days = rng.integers(50, 301, n_block)
+            day_customer = np.repeat(np.arange(n_block), usage_days)
+            day_offsets = rng.integers(0, n_window_days, len(day_customer))
             
-            # Daily usage for each active feature
-            for feature in active_features:
-                if random.random() < 0.7:  # 70% chance feature is used on active day
-                    
-                    # Usage patterns vary by feature and adoption stage
-                    base_usage = {'Trial': 2, 'Basic': 5, 'Intermediate': 12, 'Advanced': 25, 'Power User': 50}
-                    usage_count = random.randint(1, base_usage[customer_adoption])
-                    
-                    # Session duration varies by feature
-                    if feature in ['Dashboard', 'Reports']:
-                        session_duration = random.randint(300, 3600)  # 5-60 minutes
-                    elif feature in ['API', 'Integrations']:
-                        session_duration = random.randint(60, 600)   # 1-10 minutes
-                    else:
-                        session_duration = random.randint(120, 1800)  # 2-30 minutes
-                    
-                    # User count (for multi-user accounts)
-                    if customer_adoption in ['Advanced', 'Power User']:
-                        user_count = random.randint(1, 10)
-                    else:
-                        user_count = random.randint(1, 3)
-                    
-                    rows.append({
-                        'usage_id': usage_id,
-                        'customer_id': customer_id,
-                        'date': usage_date.strftime('%Y-%m-%d'),
-                        'feature_name': feature,
-                        'usage_count': usage_count,
-                        'session_duration': session_duration,
-                        'user_count': user_count,
-                        'adoption_stage': customer_adoption
-                    })
-                    
-                    usage_id += 1
-    
-    write_csv('success', 'product_usage_analytics', fieldnames, rows)
-    return rows
+            # Each active feature has a 70% chance of being used on an active day
+            used = active_features[day_customer] & (rng.random((len(day_customer), len(features))) < 0.7)
+            usage_day, feature_idx = np.nonzero(used)
+            customer_idx = day_customer[usage_day]
+            row_stages = stages[customer_idx]
+            n_rows = len(usage_day)
+            
+            # Usage patterns vary by feature and adoption stage
+            usage_counts = rng.integers(1, max_usage_counts[row_stages] + 1)
+            duration_low, duration_high = duration_ranges[feature_idx].T
+            session_durations = rng.integers(duration_low, duration_high + 1)
+            user_counts = rng.integers(1, max_user_counts[row_stages] + 1)
+            dates = np.datetime64(start_date) + day_offsets[usage_day]
+            
+            yield [
+                range(usage_id, usage_id + n_rows),
+                customer_ids[customer_idx].tolist(),
+                format_dates(dates).tolist(),
+                features[feature_idx].tolist(),
+                usage_counts.tolist(),
+                session_durations.tolist(),
+                user_counts.tolist(),
+                adoption_stages[row_stages].tolist()
+            ]
+            usage_id += n_rows
+    
+    # Stream customer blocks straight to disk; the table is too large to keep in memory
+    return write_csv_blocks('success', 'product_usage_analytics', fieldnames, usage_blocks(), partition_column='date')
 
 # 4. SUPPORT AND SERVICE DATA
-def generate_support_data(n_customers=4000):
+def generate_support_data(n_customers=4000, block_size=500_000):
     fieldnames = [
         'ticket_id', 'customer_id', 'created_date', 'resolved_date', 'priority', 
         'category', 'resolution_time_hours', 'satisfaction_score', 'agent_id'
     ]
     
-    priorities = ['Low', 'Medium', 'High', 'Critical']
-    categories = ['Technical Issue', 'Feature Request', 'Account Management', 'Billing', 
-                 'Integration', 'Training', 'Bug Report', 'Performance', 'Security']
+    priorities = np.array(['Low', 'Medium', 'High', 'Critical'])
+    categories = np.array(['Technical Issue', 'Feature Request', 'Account Management', 'Billing', 
+                           'Integration', 'Training', 'Bug Report', 'Performance', 'Security'])
+    
+    # Number of tickets per customer varies (1-10)
+    ticket_count_sampler = CategoricalSampler(range(1, 11), weights=[0.3, 0.25, 0.2, 0.1, 0.05, 0.04, 0.03, 0.02, 0.005, 0.005])
+    
+    # Priority distribution and resolution hour range per priority
+    priority_sampler = CategoricalSampler(priorities, weights=[0.4, 0.35, 0.2, 0.05])
+    resolution_hour_ranges = np.array([[24, 168], [8, 72], [4, 24], [1, 8]])
+    
+    # Satisfaction score (1-5, higher for faster resolution): one CDF per
+    # resolution bucket (<= 4 hours, <= 24 hours, longer)
+    resolution_bucket_edges = np.array([4, 24])
+    satisfaction_cdfs = np.cumsum([
+        [0.0, 0.0, 0.1, 0.3, 0.6],
+        [0.0, 0.1, 0.2, 0.4, 0.3],
+        [0.2, 0.3, 0.3, 0.2, 0.0]
+    ], axis=1)
     
-    rows = []
+    # Pin each CDF's last value to exactly 1 so rounding can't push a draw past the end
+    satisfaction_cdfs /= satisfaction_cdfs[:, -1:]
     
     # Generate support tickets over 3 years
     start_date = datetime.now().date() - timedelta(days=3*365)
     end_date = datetime.now().date()
+    n_window_days = (end_date - start_date).days + 1
     
     # Support agents
-    agent_ids = list(range(1, 21))  # 20 support agents
-    
-    ticket_id = 1
+    n_agents = 20
     
     # Generate tickets for customers (not all customers create tickets)
-    active_customers = random.sample(range(1, n_customers + 1), int(n_customers * 0.8))  # 80% create tickets
+    active_customers = rng.permutation(n_customers)[:int(n_customers * 0.8)] + 1  # 80% create tickets
     
-    for customer_id in active_customers:
-        # Number of tickets per customer varies
-        num_tickets = random.choices([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 
-                                   weights=[0.3, 0.25, 0.2, 0.1, 0.05, 0.04, 0.03, 0.02, 0.005, 0.005])[0]
-        
-        for _ in range(num_tickets):
-            created_date = fake.date_between(start_date=start_date, end_date=end_date)
+    def ticket_blocks():
+        ticket_id = 1
+        for block_start in range(0, len(active_customers), block_size):
+            customer_ids = active_customers[block_start:block_start + block_size]
+            num_tickets = ticket_count_sampler.sample_indices(rng, len(customer_ids)) + 1
+            ticket_customers = np.repeat(customer_ids, num_tickets)
+            n_tickets = len(ticket_customers)
             
-            # Priority distribution
-            priority = random.choices(priorities, weights=[0.4, 0.35, 0.2, 0.05])[0]
+            created_dates = np.datetime64(start_date) + rng.integers(0, n_window_days, n_tickets)
+            priority_idx = priority_sampler.sample_indices(rng, n_tickets)
             
             # Resolution time based on priority
-            if priority == 'Critical':
-                resolution_hours = random.randint(1, 8)
-            elif priority == 'High':
-                resolution_hours = random.randint(4, 24)
-            elif priority == 'Medium':
-                resolution_hours = random.randint(8, 72)
-            else:  # Low
-                resolution_hours = random.randint(24, 168)
-            
-            resolved_date = created_date + timedelta(hours=resolution_hours)
+            hours_low, hours_high = resolution_hour_ranges[priority_idx].T
+            resolution_hours = rng.integers(hours_low, hours_high + 1)
+            resolved_dates = created_dates + resolution_hours // 24  # Date part of created + hours
             
-            # Satisfaction score (1-5, higher for faster resolution)
-            if resolution_hours <= 4:
-                satisfaction = random.choices([3, 4, 5], weights=[0.1, 0.3, 0.6])[0]
-            elif resolution_hours <= 24:
-                satisfaction = random.choices([2, 3, 4, 5], weights=[0.1, 0.2, 0.4, 0.3])[0]
-            else:
-                satisfaction = random.choices([1, 2, 3, 4], weights=[0.2, 0.3, 0.3, 0.2])[0]
+            # Gather each ticket's satisfaction CDF by resolution bucket and invert it
+            buckets = np.searchsorted(resolution_bucket_edges, resolution_hours, side='left')
+            satisfaction = (rng.random(n_tickets)[:, None] >= satisfaction_cdfs[buckets]).sum(axis=1) + 1
             
-            rows.append({
-                'ticket_id': ticket_id,
-                'customer_id': customer_id,
-                'created_date': created_date.strftime('%Y-%m-%d'),
-                'resolved_date': resolved_date.strftime('%Y-%m-%d'),
-                'priority': priority,
-                'category': random.choice(categories),
-                'resolution_time_hours': resolution_hours,
-                'satisfaction_score': satisfaction,
-                'agent_id': random.choice(agent_ids)
-            })
-            
-            ticket_id += 1
+            yield [
+                range(ticket_id, ticket_id + n_tickets),
+                ticket_customers.tolist(),
+                format_dates(created_dates).tolist(),
+                format_dates(resolved_dates).tolist(),
+                priorities[priority_idx].tolist(),
+                categories[rng.integers(0, len(categories), n_tickets)].tolist(),
+                resolution_hours.tolist(),
+                satisfaction.tolist(),
+                rng.integers(1, n_agents + 1, n_tickets).tolist()
+            ]
+            ticket_id += n_tickets
     
-    write_csv('success', 'support_data', fieldnames, rows)
-    return rows
+    return write_csv_blocks('success', 'support_data', fieldnames, ticket_blocks())
 
 # MAIN EXECUTION FOR CUSTOMER SUCCESS DATA
 def generate_customer_success_data():
     print("Generating Customer Success & Retention Data...")
     print("=" * 60)
     
-    # Generate all customer success tables
-    customer_health_scores = generate_customer_health_scores(4000)
-    churn_and_retention = generate_churn_and_retention_data(4000)
-    product_usage_analytics = generate_product_usage_analytics(4000)
-    support_data = generate_support_data(4000)
+    if resuming:
+        # Snapshot tables were written by the first incremental run; only extend the time series
+        customer_health_scores = generate_customer_health_scores(4000)
+    else:
+        # Generate all customer success tables
+        customer_health_scores = generate_customer_health_scores(4000)
+        churn_and_retention = generate_churn_and_retention_data(4000)
+        product_usage_analytics = generate_product_usage_analytics(4000)
+        support_data = generate_support_data(4000)
+    
+    if state:
+        state.save()
     
     print("=" * 60)
     print("Customer Success & Retention data generation complete!")
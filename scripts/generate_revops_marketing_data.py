@@ -1,30 +1,69 @@
+import argparse
 import os
-import csv
+from functools import partial
 import random
 from datetime import datetime, timedelta
+import numpy as np
 from faker import Faker
+import output_writers
+from output_writers import count_csv_records, output_path
+from samplers import CategoricalSampler
+from calendar_strings import format_dates
+from segments import segment_cumsum
+from row_buffer import RowBuffer
+from attribution import ATTRIBUTION_MODELS, attribute_touches
+from generation_state import GenerationState, format_state_date, parse_state_date
 import uuid
 
 # Set up Faker and random seed for reproducibility
 fake = Faker()
 random.seed(42)
 Faker.seed(42)
+rng = np.random.default_rng(42)
+
+# Command-line options
+parser = argparse.ArgumentParser(description="Generate RevOps marketing data")
+parser.add_argument('--incremental', action='store_true',
+                    help="append only new periods to output/revops_incremental instead of rebuilding a dated snapshot")
+parser.add_argument('--partitioned', nargs='?', const='csv', choices=['csv', 'parquet'],
+                    help="lay large time-series tables out as date=YYYY-MM partitions (csv or parquet)")
+parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                    help="compress CSV output on a background thread pool")
+args, _ = parser.parse_known_args()
 
 # Output directory (assuming core data was already generated)
 today_str = datetime.now().strftime("%m-%d")
 script_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else '.'
-output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
+if args.incremental:
+    output_dir = os.path.join(script_dir, "../output/revops_incremental")
+else:
+    output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
 os.makedirs(output_dir, exist_ok=True)
 
-# Helper to write CSV
-def write_csv(subdomain, table_name, fieldnames, rows):
-    filename = f"{output_dir}/revops_{subdomain}_{table_name}.csv"
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    print(f"Wrote {filename} with {len(rows)} records")
+# Generator state for incremental runs (None for full rebuilds)
+state = GenerationState(os.path.join(output_dir, 'generator_state_marketing.json')) if args.incremental else None
+resuming = state is not None and state.run_number > 0
+if resuming:
+    # Fresh random stream per run so appended periods don't replay earlier ones
+    random.seed(42 + state.run_number)
+    Faker.seed(42 + state.run_number)
+    rng = np.random.default_rng(42 + state.run_number)
+
+# Table writers bound to this run's output directory and options
+write_csv = partial(output_writers.write_csv, output_dir,
+                    partitioned=args.partitioned, compression=args.compress)
+write_csv_blocks = partial(output_writers.write_csv_blocks, output_dir,
+                           partitioned=args.partitioned, compression=args.compress)
+partitioned_writer = partial(output_writers.partitioned_writer, output_dir,
+                             partitioned=args.partitioned, compression=args.compress)
+
+# Helper to size a table by the core table it references, when core data was generated first
+def core_table_size(table_name, default):
+    for compression in (None, 'gzip', 'zstd'):
+        filename = output_path(f"{output_dir}/revops_core_{table_name}.csv", compression)
+        if os.path.exists(filename):
+            return count_csv_records(filename)
+    return default
 
 # Helper function to generate date ranges
 def date_range(start_date, end_date, step_days=1):
@@ -34,58 +73,95 @@ def date_range(start_date, end_date, step_days=1):
         current += timedelta(days=step_days)
 
 # 1. MARKETING ATTRIBUTION DATA
-def generate_marketing_attribution_data(n=45000):
+def generate_marketing_attribution_data(n_leads=75000, n_opportunities=15000, block_size=250_000):
     fieldnames = [
         'attribution_id', 'campaign_id', 'campaign_name', 'channel', 'lead_id', 
-        'opportunity_id', 'attribution_model', 'credit_percentage', 'spend', 'revenue_attributed'
+        'opportunity_id', 'attribution_model', 'credit_percentage', 'spend', 'revenue_attributed',
+        'touch_date'
     ]
     
-    channels = ['Paid Search', 'Social Media', 'Email', 'Content Marketing', 'Webinar', 
-               'Trade Show', 'Partner', 'Direct', 'Organic Search', 'Display Ads']
-    attribution_models = ['First Touch', 'Last Touch', 'Linear', 'Time Decay', 'Position Based']
+    channels = np.array(['Paid Search', 'Social Media', 'Email', 'Content Marketing', 'Webinar', 
+                         'Trade Show', 'Partner', 'Direct', 'Organic Search', 'Display Ads'])
+    attribution_models = np.array(ATTRIBUTION_MODELS)
     
-    # Generate campaign data first
-    campaigns = []
-    for i in range(1, 201):  # 200 campaigns over 3 years
-        campaigns.append({
-            'campaign_id': i,
-            'campaign_name': f"{random.choice(['Q1', 'Q2', 'Q3', 'Q4'])} {random.choice(['2022', '2023', '2024'])} {fake.catch_phrase()}",
-            'channel': random.choice(channels),
-            'spend': round(random.uniform(5000, 100000), 2)
-        })
+    # Generate campaign data first, as one array per attribute
+    n_campaigns = 200  # 200 campaigns over 3 years
+    campaign_ids = np.arange(1, n_campaigns + 1)
+    campaign_names = np.array([
+        f"{random.choice(['Q1', 'Q2', 'Q3', 'Q4'])} {random.choice(['2022', '2023', '2024'])} {fake.catch_phrase()}"
+        for _ in range(n_campaigns)
+    ])
+    campaign_channels = channels[rng.integers(0, len(channels), n_campaigns)]
+    campaign_spend = rng.uniform(5000, 100000, n_campaigns)
     
-    rows = []
-    for i in range(1, n+1):
-        campaign = random.choice(campaigns)
-        
-        # Attribution credit varies by model
-        model = random.choice(attribution_models)
-        if model == 'Linear':
-            credit = round(random.uniform(0.1, 0.5), 3)
-        elif model in ['First Touch', 'Last Touch']:
-            credit = 1.0
-        else:
-            credit = round(random.uniform(0.2, 0.8), 3)
-        
-        # Revenue attributed based on spend and performance
-        revenue_multiplier = random.uniform(0.5, 8.0)  # ROI varies widely
-        revenue_attributed = campaign['spend'] * revenue_multiplier * credit
-        
-        rows.append({
-            'attribution_id': i,
-            'campaign_id': campaign['campaign_id'],
-            'campaign_name': campaign['campaign_name'],
-            'channel': campaign['channel'],
-            'lead_id': random.randint(1, 75000),  # Reference to leads from core data
-            'opportunity_id': random.randint(1, 15000) if random.random() < 0.3 else '',  # 30% have opportunities
-            'attribution_model': model,
-            'credit_percentage': credit,
-            'spend': round(campaign['spend'] * credit, 2),
-            'revenue_attributed': round(revenue_attributed, 2)
-        })
+    # Each lead has an ordered path of touches (3 on average); campaign spend is
+    # spread evenly over the touches a campaign is expected to get
+    mean_path_length = 3
+    cost_per_touch = campaign_spend * n_campaigns / (n_leads * mean_path_length)
+    
+    start_date = datetime.now().date() - timedelta(days=3*365)
+    n_window_days = (datetime.now().date() - start_date).days + 1
+    
+    # Each opportunity comes from exactly one converted lead, so its path's
+    # credits sum to 1 (reference to leads and opportunities from core data)
+    if n_opportunities > n_leads:
+        raise ValueError(f"{n_opportunities} opportunities can't each come from a distinct lead out of {n_leads}")
+    opportunity_ids = rng.permutation(n_opportunities) + 1
+    
+    def attribution_blocks():
+        attribution_id = 1
+        leads_left, opportunities_left = n_leads, n_opportunities
+        for first_lead in range(1, n_leads + 1, block_size):
+            lead_ids = np.arange(first_lead, min(first_lead + block_size, n_leads + 1))
+            n_block = len(lead_ids)
+            
+            # Exactly n_opportunities converted leads overall, drawn block by block
+            n_converted = rng.hypergeometric(opportunities_left, leads_left - opportunities_left, n_block) if leads_left > opportunities_left else n_block
+            converted = np.zeros(n_block, dtype=bool)
+            converted[rng.choice(n_block, n_converted, replace=False)] = True
+            path_opportunities = np.full(n_block, '', dtype=object)
+            taken = n_opportunities - opportunities_left
+            path_opportunities[converted] = opportunity_ids[taken:taken + n_converted]
+            leads_left -= n_block
+            opportunities_left -= n_converted
+            
+            # Touch paths: first touch somewhere in the window, then 0-30 day gaps
+            path_lengths = 1 + rng.poisson(mean_path_length - 1, n_block)
+            n_touches = int(path_lengths.sum())
+            first_touch_days = np.repeat(rng.integers(0, n_window_days, n_block), path_lengths)
+            gaps = rng.integers(0, 31, n_touches)
+            gaps[np.cumsum(path_lengths) - path_lengths] = 0
+            touch_days = np.minimum(first_touch_days + segment_cumsum(gaps, path_lengths), n_window_days - 1)
+            
+            # Conversion (or last activity) follows the final touch by 0-14 days
+            last_touch_days = touch_days[np.cumsum(path_lengths) - 1]
+            conversion_days = np.repeat(last_touch_days + rng.integers(0, 15, n_block), path_lengths)
+            
+            # Attribution credit varies by model; each path is credited under one model
+            path_models = rng.integers(0, len(attribution_models), n_block)
+            credit = attribute_touches(path_lengths, path_models, conversion_days - touch_days)
+            
+            # Revenue attributed is the credited share of the opportunity's value
+            opportunity_value = np.where(converted, rng.uniform(5000, 500000, n_block), 0.0)
+            campaign_idx = rng.integers(0, n_campaigns, n_touches)
+            
+            yield [
+                range(attribution_id, attribution_id + n_touches),
+                campaign_ids[campaign_idx].tolist(),
+                campaign_names[campaign_idx].tolist(),
+                campaign_channels[campaign_idx].tolist(),
+                np.repeat(lead_ids, path_lengths).tolist(),
+                np.repeat(path_opportunities, path_lengths).tolist(),
+                np.repeat(attribution_models[path_models], path_lengths).tolist(),
+                np.round(credit, 6).tolist(),
+                np.round(cost_per_touch[campaign_idx] * credit, 2).tolist(),
+                np.round(np.repeat(opportunity_value, path_lengths) * credit, 2).tolist(),
+                format_dates(np.datetime64(start_date) + touch_days).tolist()
+            ]
+            attribution_id += n_touches
     
-    write_csv('marketing', 'marketing_attribution', fieldnames, rows)
-    return rows
+    # Stream lead blocks straight to disk so memory stays bounded at any volume
+    return write_csv_blocks('marketing', 'marketing_attribution', fieldnames, attribution_blocks())
 
 # 2. WEBSITE ANALYTICS DATA
 def generate_website_analytics_data(n=1095000):  # ~1000 sessions per day for 3 years
@@ -100,15 +176,32 @@ def generate_website_analytics_data(n=1095000):  # ~1000 sessions per day for 3
     conversion_events = ['', 'Form Submit', 'Download', 'Demo Request', 'Trial Signup', 'Contact Us']
     countries = ['United States', 'Canada', 'United Kingdom', 'Germany', 'France', 'Australia', 'Japan']
     
-    rows = []
+    # Conversion events are rare
+    conversion_sampler = CategoricalSampler(conversion_events, weights=[0.85, 0.05, 0.04, 0.03, 0.02, 0.01])
+    device_type_sampler = CategoricalSampler(device_types, weights=[0.5, 0.4, 0.1])
+    
+    # Sessions are stored column-wise; numeric columns are packed arrays
+    typecodes = {'page_views': 'l', 'session_duration': 'l', 'bounce_rate': 'b'}
+    rows = RowBuffer(fieldnames, typecodes)
     
-    # Generate data in chunks to avoid memory issues
     start_date = datetime.now().date() - timedelta(days=3*365)
     end_date = datetime.now().date()
     
     session_id = 1
     user_id = 1
     
+    # Incremental runs continue from the day after the last one written
+    table_state = state.get('website_analytics') if state else None
+    if table_state:
+        start_date = parse_state_date(table_state['last_date']) + timedelta(days=1)
+        user_id = table_state['next_user_id']
+    
+    # Partitioned output streams each day's sessions out as soon as they are generated
+    writer = None
+    if args.partitioned:
+        writer = partitioned_writer('marketing', 'website_analytics', fieldnames, 'date', append=table_state is not None)
+    total_sessions = 0
+    
     for current_date in date_range(start_date, end_date):
         # Sessions per day varies (weekends lower, some seasonal patterns)
         if current_date.weekday() >= 5:  # Weekend
@@ -116,6 +209,8 @@ def generate_website_analytics_data(n=1095000):  # ~1000 sessions per day for 3
         else:  # Weekday
             daily_sessions = random.randint(900, 1200)
         
+        day_rows = rows if writer is None else RowBuffer(fieldnames, typecodes)
+        date_str = current_date.strftime('%Y-%m-%d')
         for _ in range(daily_sessions):
             # Session duration in seconds
             duration = random.randint(30, 1800)  # 30 seconds to 30 minutes
@@ -134,165 +229,160 @@ def generate_website_analytics_data(n=1095000):  # ~1000 sessions per day for 3
             else:
                 page_views = random.randint(3, 15)
             
-            # Conversion events are rare
-            conversion = random.choices(conversion_events, weights=[0.85, 0.05, 0.04, 0.03, 0.02, 0.01])[0]
+            conversion = conversion_sampler.sample()
             
-            rows.append({
-                'session_id': str(uuid.uuid4()),
-                'date': current_date.strftime('%Y-%m-%d'),
-                'user_id': f"user_{user_id}",
-                'page_views': page_views,
-                'session_duration': duration,
-                'bounce_rate': bounce,
-                'conversion_event': conversion,
-                'traffic_source': random.choice(traffic_sources),
-                'device_type': random.choices(device_types, weights=[0.5, 0.4, 0.1])[0],
-                'geography': random.choice(countries)
-            })
+            day_rows.append_values(
+                str(uuid.uuid4()),
+                date_str,
+                f"user_{user_id}",
+                page_views,
+                duration,
+                bounce,
+                conversion,
+                random.choice(traffic_sources),
+                device_type_sampler.sample(),
+                random.choice(countries)
+            )
             
             session_id += 1
             if random.random() < 0.3:  # 30% chance of new user
                 user_id += 1
+        
+        total_sessions += daily_sessions
+        if writer is not None:
+            writer.write_columns(day_rows.columns_in(fieldnames))
+            rows.extend_columns(day_rows[:max(0, 1000 - len(rows))].columns_in())  # Keep a sample to return
     
-    # Write in chunks to avoid memory issues
-    chunk_size = 50000
-    for i in range(0, len(rows), chunk_size):
-        chunk = rows[i:i+chunk_size]
-        if i == 0:
-            write_csv('marketing', 'website_analytics', fieldnames, chunk)
-        else:
-            # Append to existing file
-            filename = f"{output_dir}/revops_marketing_website_analytics.csv"
-            with open(filename, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                for row in chunk:
-                    writer.writerow(row)
+    if writer is not None:
+        writer.close()
+    else:
+        # The column buffer is written block by block straight from its columns
+        write_csv('marketing', 'website_analytics', fieldnames, rows, append=table_state is not None)
     
-    print(f"Total website analytics records: {len(rows)}")
+    print(f"Total website analytics records: {total_sessions}")
+    if state:
+        state.set('website_analytics', {
+            'last_date': format_state_date(max(end_date, start_date - timedelta(days=1))),
+            'next_user_id': user_id
+        })
     return rows[:1000]  # Return sample for memory
 
 # 3. LEAD SCORING DATA
-def generate_lead_scoring_data(n=225000):  # ~3 scores per lead on average
+def generate_lead_scoring_data(n_leads=75000, block_size=250_000):  # ~2.4 scores per lead on average
     fieldnames = [
         'lead_id', 'email_engagement_score', 'website_activity_score', 
         'demographic_score', 'firmographic_score', 'total_score', 'score_date'
     ]
     
-    rows = []
-    score_id = 1
+    num_scores_sampler = CategoricalSampler([1, 2, 3, 4, 5], weights=[0.3, 0.25, 0.25, 0.15, 0.05])
+    score_weights = np.array([0.3, 0.3, 0.2, 0.2])
     
-    # Generate multiple scores per lead over time
-    for lead_id in range(1, 75001):  # For each lead
-        num_scores = random.choices([1, 2, 3, 4, 5], weights=[0.3, 0.25, 0.25, 0.15, 0.05])[0]
-        
-        base_date = fake.date_between(start_date='-3y', end_date='today')
-        
-        for i in range(num_scores):
-            # Scores evolve over time
-            score_date = base_date + timedelta(days=random.randint(0, 365))
-            
-            # Individual component scores (0-100)
-            email_score = random.randint(0, 100)
-            website_score = random.randint(0, 100)
-            demo_score = random.randint(0, 100)
-            firmo_score = random.randint(0, 100)
+    start_date = datetime.now().date() - timedelta(days=3*365)
+    n_window_days = (datetime.now().date() - start_date).days + 1
+    
+    # Generate multiple scores per lead over time, one flat block of score rows per block of leads
+    def score_blocks():
+        for first_lead in range(1, n_leads + 1, block_size):
+            lead_ids = np.arange(first_lead, min(first_lead + block_size, n_leads + 1))
+            num_scores = np.asarray(num_scores_sampler.sample_array(rng, len(lead_ids)), dtype=np.int64)
+            n_rows = int(num_scores.sum())
             
-            # Total score is weighted average
-            total_score = round((email_score * 0.3 + website_score * 0.3 + 
-                              demo_score * 0.2 + firmo_score * 0.2), 1)
+            # Scores evolve over time: each is 0-365 days after the previous one
+            base_days = np.repeat(rng.integers(0, n_window_days, len(lead_ids)), num_scores)
+            score_days = base_days + segment_cumsum(rng.integers(0, 366, n_rows), num_scores)
             
-            rows.append({
-                'lead_id': lead_id,
-                'email_engagement_score': email_score,
-                'website_activity_score': website_score,
-                'demographic_score': demo_score,
-                'firmographic_score': firmo_score,
-                'total_score': total_score,
-                'score_date': score_date.strftime('%Y-%m-%d')
-            })
+            # Individual component scores (0-100); total score is weighted average
+            components = rng.integers(0, 101, (n_rows, 4))
+            total_score = np.round(components @ score_weights, 1)
             
-            # Scores generally improve over time
-            base_date = score_date
+            yield [
+                np.repeat(lead_ids, num_scores).tolist(),
+                *components.T.tolist(),
+                total_score.tolist(),
+                format_dates(np.datetime64(start_date) + score_days).tolist()
+            ]
     
-    write_csv('marketing', 'lead_scoring', fieldnames, rows)
-    return rows
+    return write_csv_blocks('marketing', 'lead_scoring', fieldnames, score_blocks())
 
 # 4. MARKETING AUTOMATION DATA
-def generate_marketing_automation_data(n=180000):
+def generate_marketing_automation_data(n=180000, n_campaigns=500, n_contacts=25000, block_size=1_000_000):
     fieldnames = [
         'campaign_id', 'email_id', 'contact_id', 'sent_date', 'open_rate', 
         'click_rate', 'conversion_rate', 'unsubscribe_rate', 'campaign_type'
     ]
     
-    campaign_types = ['Newsletter', 'Product Update', 'Nurture Sequence', 'Event Invitation', 
-                     'Webinar', 'Case Study', 'Trial Reminder', 'Onboarding']
+    campaign_types = np.array(['Newsletter', 'Product Update', 'Nurture Sequence', 'Event Invitation', 
+                               'Webinar', 'Case Study', 'Trial Reminder', 'Onboarding'])
     
-    rows = []
+    # Generate campaigns first (500 email campaigns over 3 years by default)
+    campaign_type = campaign_types[rng.integers(0, len(campaign_types), n_campaigns)]
+    base_open_rate = rng.uniform(0.15, 0.35, n_campaigns)
+    base_click_rate = rng.uniform(0.02, 0.08, n_campaigns)
+    base_conversion_rate = rng.uniform(0.005, 0.03, n_campaigns)
+    base_unsubscribe_rate = rng.uniform(0.001, 0.01, n_campaigns)
     
-    # Generate campaigns first
-    campaigns = []
-    for i in range(1, 501):  # 500 email campaigns over 3 years
-        campaigns.append({
-            'campaign_id': i,
-            'campaign_type': random.choice(campaign_types),
-            'base_open_rate': random.uniform(0.15, 0.35),
-            'base_click_rate': random.uniform(0.02, 0.08),
-            'base_conversion_rate': random.uniform(0.005, 0.03),
-            'base_unsubscribe_rate': random.uniform(0.001, 0.01)
-        })
+    # Each campaign has multiple emails sent to different contacts; stop once n emails are sent
+    emails_in_campaign = rng.integers(100, 2001, n_campaigns)
+    campaign_end = np.cumsum(emails_in_campaign)
+    n_emails = int(min(n, campaign_end[-1])) if n_campaigns else 0
     
-    email_id = 1
+    start_date = datetime.now().date() - timedelta(days=3*365)
+    n_window_days = (datetime.now().date() - start_date).days + 1
     
-    for campaign in campaigns:
-        # Each campaign has multiple emails sent to different contacts
-        emails_in_campaign = random.randint(100, 2000)
-        
-        for _ in range(emails_in_campaign):
-            sent_date = fake.date_between(start_date='-3y', end_date='today')
+    def email_blocks():
+        for first_email in range(0, n_emails, block_size):
+            email_idx = np.arange(first_email, min(first_email + block_size, n_emails))
+            size = len(email_idx)
+            campaign_idx = np.searchsorted(campaign_end, email_idx, side='right')
+            sent_days = rng.integers(0, n_window_days, size)
             
-            # Performance varies around base rates
-            open_rate = max(0, min(1, campaign['base_open_rate'] + random.uniform(-0.05, 0.05)))
-            click_rate = max(0, min(open_rate, campaign['base_click_rate'] + random.uniform(-0.02, 0.02)))
-            conversion_rate = max(0, min(click_rate, campaign['base_conversion_rate'] + random.uniform(-0.01, 0.01)))
-            unsubscribe_rate = max(0, min(0.05, campaign['base_unsubscribe_rate'] + random.uniform(-0.002, 0.002)))
+            # Performance varies around base rates; each funnel rate is capped by the one before it
+            open_rate = np.clip(base_open_rate[campaign_idx] + rng.uniform(-0.05, 0.05, size), 0, 1)
+            click_rate = np.clip(base_click_rate[campaign_idx] + rng.uniform(-0.02, 0.02, size), 0, None)
+            click_rate = np.minimum(click_rate, open_rate)
+            conversion_rate = np.clip(base_conversion_rate[campaign_idx] + rng.uniform(-0.01, 0.01, size), 0, None)
+            conversion_rate = np.minimum(conversion_rate, click_rate)
+            unsubscribe_rate = np.clip(base_unsubscribe_rate[campaign_idx] + rng.uniform(-0.002, 0.002, size), 0, 0.05)
             
-            rows.append({
-                'campaign_id': campaign['campaign_id'],
-                'email_id': email_id,
-                'contact_id': random.randint(1, 25000),  # Reference to contacts from core data
-                'sent_date': sent_date.strftime('%Y-%m-%d'),
-                'open_rate': round(open_rate, 4),
-                'click_rate': round(click_rate, 4),
-                'conversion_rate': round(conversion_rate, 4),
-                'unsubscribe_rate': round(unsubscribe_rate, 4),
-                'campaign_type': campaign['campaign_type']
-            })
-            
-            email_id += 1
-            
-            if len(rows) >= n:
-                break
-        
-        if len(rows) >= n:
-            break
+            yield [
+                (campaign_idx + 1).tolist(),
+                range(first_email + 1, first_email + size + 1),
+                rng.integers(1, n_contacts + 1, size).tolist(),  # Reference to contacts from core data
+                format_dates(np.datetime64(start_date) + sent_days).tolist(),
+                np.round(open_rate, 4).tolist(),
+                np.round(click_rate, 4).tolist(),
+                np.round(conversion_rate, 4).tolist(),
+                np.round(unsubscribe_rate, 4).tolist(),
+                campaign_type[campaign_idx].tolist()
+            ]
     
-    write_csv('marketing', 'marketing_automation', fieldnames, rows)
-    return rows
+    return write_csv_blocks('marketing', 'marketing_automation', fieldnames, email_blocks())
 
 # MAIN EXECUTION FOR MARKETING DATA
 def generate_marketing_data():
     print("Generating Marketing & Lead Generation Data...")
     print("=" * 60)
     
-    # Generate all marketing tables
-    marketing_attribution = generate_marketing_attribution_data(45000)
-    website_analytics = generate_website_analytics_data(1095000)  # This will be large
-    lead_scoring = generate_lead_scoring_data(225000)
-    marketing_automation = generate_marketing_automation_data(180000)
+    if resuming:
+        # Static tables were written by the first incremental run; only extend the time series
+        website_analytics = generate_website_analytics_data(1095000)
+    else:
+        # Generate all marketing tables
+        n_leads = core_table_size('leads', 75000)
+        # Each attributed opportunity needs its own converted lead
+        n_opportunities = min(core_table_size('opportunities', 15000), n_leads)
+        marketing_attribution = generate_marketing_attribution_data(n_leads, n_opportunities)
+        website_analytics = generate_website_analytics_data(1095000)  # This will be large
+        lead_scoring = generate_lead_scoring_data(n_leads)
+        marketing_automation = generate_marketing_automation_data(180000, n_contacts=core_table_size('contacts', 25000))
+    
+    if state:
+        state.save()
     
     print("=" * 60)
     print("Marketing & Lead Generation data generation complete!")
     print(f"Output directory: {output_dir}")
 
 # Execute the generation
-generate_marketing_data()
\ No newline at end of file
+if __name__ == "__main__":
+    generate_marketing_data()
\ No newline at end of file
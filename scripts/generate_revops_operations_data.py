@@ -1,221 +1,245 @@
+import argparse
 import os
-import csv
+from functools import partial
 import random
 from datetime import datetime, timedelta
+import numpy as np
 from faker import Faker
-import uuid
+import output_writers
+from samplers import CategoricalSampler
+from calendar_strings import format_dates
+from generation_state import GenerationState, format_state_date, parse_state_date
+from random_walk import ragged_mask, random_walk, values_at
+from period_grid import PeriodGrid
 
 # Set up Faker and random seed for reproducibility
 fake = Faker()
 random.seed(42)
 Faker.seed(42)
+rng = np.random.default_rng(42)
+
+# Command-line options
+parser = argparse.ArgumentParser(description="Generate RevOps financial and operational data")
+parser.add_argument('--incremental', action='store_true',
+                    help="append only new periods to output/revops_incremental instead of rebuilding a dated snapshot")
+parser.add_argument('--partitioned', nargs='?', const='csv', choices=['csv', 'parquet'],
+                    help="lay large time-series tables out as date=YYYY-MM partitions (csv or parquet)")
+parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                    help="compress CSV output on a background thread pool")
+args, _ = parser.parse_known_args()
 
 # Output directory
 today_str = datetime.now().strftime("%m-%d")
 script_dir = os.path.dirname(os.path.abspath(__file__))
-output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
+if args.incremental:
+    output_dir = os.path.join(script_dir, "../output/revops_incremental")
+else:
+    output_dir = os.path.join(script_dir, f"../output/revops_{today_str}")
 os.makedirs(output_dir, exist_ok=True)
 
-# Helper to write CSV
-def write_csv(subdomain, table_name, fieldnames, rows):
-    filename = f"{output_dir}/revops_{subdomain}_{table_name}.csv"
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    print(f"Wrote {filename} with {len(rows)} records")
+# Generator state for incremental runs (None for full rebuilds)
+state = GenerationState(os.path.join(output_dir, 'generator_state_financial.json')) if args.incremental else None
+resuming = state is not None and state.run_number > 0
+if resuming:
+    # Fresh random stream per run so appended periods don't replay earlier ones
+    random.seed(42 + state.run_number)
+    Faker.seed(42 + state.run_number)
+    rng = np.random.default_rng(42 + state.run_number)
 
-# Helper function to generate date ranges
-def date_range(start_date, end_date, step_days=1):
-    current = start_date
-    while current <= end_date:
-        yield current
-        current += timedelta(days=step_days)
+# Table writers bound to this run's output directory and options
+write_csv_blocks = partial(output_writers.write_csv_blocks, output_dir,
+                           partitioned=args.partitioned, compression=args.compress)
 
 # 1. BILLING AND INVOICING DATA
-def generate_billing_and_invoicing_data(n_customers=4000):
+def generate_billing_and_invoicing_data(n_customers=4000, block_size=100_000):
     fieldnames = [
         'invoice_id', 'customer_id', 'invoice_date', 'due_date', 'amount', 
         'payment_date', 'payment_method', 'payment_terms', 'collection_status'
     ]
     
-    payment_methods = ['Credit Card', 'ACH', 'Wire Transfer', 'Check', 'PayPal']
-    payment_terms = ['Net 15', 'Net 30', 'Net 45', 'Net 60', 'Due on Receipt']
-    collection_statuses = ['Paid', 'Pending', 'Overdue', 'In Collection', 'Written Off']
+    payment_methods = np.array(['Credit Card', 'ACH', 'Wire Transfer', 'Check', 'PayPal'])
+    payment_terms = np.array(['Net 15', 'Net 30', 'Net 45', 'Net 60', 'Due on Receipt'])
+    terms_days = np.array([15, 30, 45, 60, 0])  # Days from invoice to due date, by payment_terms index
+    collection_statuses = np.array(['Paid', 'Pending', 'Overdue', 'In Collection', 'Written Off'])
+    PAID, PENDING, OVERDUE, IN_COLLECTION, WRITTEN_OFF = range(len(collection_statuses))
+    terms_sampler = CategoricalSampler(payment_terms, weights=[0.1, 0.6, 0.2, 0.08, 0.02])
+    long_overdue_sampler = CategoricalSampler([IN_COLLECTION, WRITTEN_OFF], weights=[0.7, 0.3])
     
-    rows = []
     invoice_id = 1
     
-    # Generate invoices over 3 years
-    start_date = datetime.now().date() - timedelta(days=3*365)
-    end_date = datetime.now().date()
+    # Generate invoices over 3 years; statuses are judged as of one frozen date
+    as_of_date = datetime.now().date()
+    start_date = as_of_date - timedelta(days=3*365)
+    as_of = np.datetime64(as_of_date, 'D')
+    end_month = np.datetime64(as_of_date, 'M')
     
-    for customer_id in range(1, n_customers + 1):
-        # Customer start date
-        customer_start = fake.date_between(start_date=start_date, end_date=end_date)
-        
-        # Generate monthly invoices from customer start
-        current_date = customer_start.replace(day=1)  # Start of month
+    # Incremental runs resume each customer's next invoice month and growing base amount
+    table_state = state.get('billing_and_invoicing') if state else None
+    if table_state:
+        invoice_id = table_state['next_invoice_id']
+        saved = [table_state['customers'][str(c)] for c in range(1, n_customers + 1)]
+        start_months = np.array([c['next_date'] for c in saved], dtype='datetime64[M]')
+        base_amounts = np.array([c['base_amount'] for c in saved])
+    else:
+        # Customer start month; invoices are generated monthly from there
+        start_offsets = rng.integers(0, (as_of_date - start_date).days + 1, n_customers)
+        start_months = (np.datetime64(start_date) + start_offsets).astype('datetime64[M]')
         
         # Base invoice amount varies by customer
-        base_amount = random.uniform(1000, 50000)
-        
-        while current_date <= end_date:
-            # Monthly invoice with some variation
-            invoice_amount = base_amount * random.uniform(0.8, 1.2)
+        base_amounts = rng.uniform(1000, 50000, n_customers)
+    
+    months_billed = np.maximum((end_month - start_months).astype(int) + 1, 0)
+    next_base_amounts = np.empty(n_customers)
+    first_invoice_id = invoice_id
+    
+    def invoice_blocks():
+        invoice_id = first_invoice_id
+        for first in range(0, n_customers, block_size):
+            block = slice(first, min(first + block_size, n_customers))
+            block_months = months_billed[block]
             
-            # Invoice date (typically first of month)
-            invoice_date = current_date
+            # Slight growth in invoice amount over time, compounded across a ragged
+            # (customers x months) grid; the extra column carries the next base amount
+            # into the saved state
+            width = int(block_months.max()) + 1
+            billed = ragged_mask(block_months, width)
+            base_walk = random_walk(rng, base_amounts[block], 1.0, 1.02, width, multiplicative=True)
+            next_base_amounts[block] = values_at(base_walk, block_months)
+            n_invoices = int(billed.sum())
             
-            # Payment terms
-            terms = random.choices(payment_terms, weights=[0.1, 0.6, 0.2, 0.08, 0.02])[0]
+            # Monthly invoice with some variation
+            invoice_amounts = base_walk[billed] * rng.uniform(0.8, 1.2, n_invoices)
+            invoice_dates = (start_months[block, None] + np.arange(width))[billed].astype('datetime64[D]')
             
             # Due date based on terms
-            if terms == 'Due on Receipt':
-                due_date = invoice_date
-            elif terms == 'Net 15':
-                due_date = invoice_date + timedelta(days=15)
-            elif terms == 'Net 30':
-                due_date = invoice_date + timedelta(days=30)
-            elif terms == 'Net 45':
-                due_date = invoice_date + timedelta(days=45)
-            else:  # Net 60
-                due_date = invoice_date + timedelta(days=60)
-            
-            # Payment behavior
-            if due_date <= datetime.now().date():
-                # Invoice is due, determine if paid
-                if random.random() < 0.85:  # 85% pay on time or late
-                    # Payment date (some pay early, some late)
-                    payment_delay = random.randint(-5, 30)  # -5 to 30 days from due date
-                    payment_date = due_date + timedelta(days=payment_delay)
-                    
-                    if payment_date <= datetime.now().date():
-                        if payment_delay <= 0:
-                            status = 'Paid'
-                        elif payment_delay <= 30:
-                            status = 'Paid'
-                        else:
-                            status = 'Overdue'
-                    else:
-                        status = 'Pending'
-                else:
-                    # Unpaid invoices
-                    days_overdue = (datetime.now().date() - due_date).days
-                    if days_overdue <= 30:
-                        status = 'Overdue'
-                        payment_date = ''
-                    elif days_overdue <= 90:
-                        status = 'In Collection'
-                        payment_date = ''
-                    else:
-                        status = random.choices(['In Collection', 'Written Off'], weights=[0.7, 0.3])[0]
-                        payment_date = ''
-            else:
-                # Future invoice
-                status = 'Pending'
-                payment_date = ''
+            terms_idx = terms_sampler.sample_indices(rng, n_invoices)
+            due_dates = invoice_dates + terms_days[terms_idx]
             
-            rows.append({
-                'invoice_id': invoice_id,
-                'customer_id': customer_id,
-                'invoice_date': invoice_date.strftime('%Y-%m-%d'),
-                'due_date': due_date.strftime('%Y-%m-%d'),
-                'amount': round(invoice_amount, 2),
-                'payment_date': payment_date.strftime('%Y-%m-%d') if payment_date else '',
-                'payment_method': random.choice(payment_methods) if payment_date else '',
-                'payment_terms': terms,
-                'collection_status': status
-            })
+            # Payment behavior: 85% of due invoices get paid (5 days early to 30 days late)
+            is_due = due_dates <= as_of
+            pays = is_due & (rng.random(n_invoices) < 0.85)
+            payment_dates = due_dates + rng.integers(-5, 31, n_invoices)
             
-            invoice_id += 1
+            # Unpaid invoices escalate with days overdue; future invoices and
+            # payments not yet received are pending
+            days_overdue = (as_of - due_dates).astype(int)
+            unpaid = is_due & ~pays
+            status = np.select(
+                [pays & (payment_dates <= as_of), unpaid & (days_overdue <= 30),
+                 unpaid & (days_overdue <= 90), unpaid],
+                [PAID, OVERDUE, IN_COLLECTION, long_overdue_sampler.sample_array(rng, n_invoices).astype(int)],
+                default=PENDING
+            )
             
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+            payment_date_str = np.where(pays, format_dates(payment_dates), '')
+            payment_method = np.where(pays, payment_methods[rng.integers(0, len(payment_methods), n_invoices)], '')
+            invoice_date_str = format_dates(invoice_dates).tolist()
             
-            # Slight growth in invoice amount over time
-            base_amount *= random.uniform(1.0, 1.02)
+            yield [
+                range(invoice_id, invoice_id + n_invoices),
+                np.repeat(np.arange(block.start + 1, block.stop + 1), block_months).tolist(),
+                invoice_date_str,
+                format_dates(due_dates).tolist(),
+                np.round(invoice_amounts, 2).tolist(),
+                payment_date_str.tolist(),
+                payment_method.tolist(),
+                payment_terms[terms_idx].tolist(),
+                collection_statuses[status].tolist()
+            ]
+            invoice_id += n_invoices
     
-    write_csv('financial', 'billing_and_invoicing', fieldnames, rows)
-    return rows
+    total = write_csv_blocks('financial', 'billing_and_invoicing', fieldnames, invoice_blocks(),
+                             append=table_state is not None, partition_column='invoice_date')
+    if state:
+        next_months = format_dates(start_months + months_billed).tolist()
+        state.set('billing_and_invoicing', {
+            'next_invoice_id': first_invoice_id + total,
+            'customers': {
+                str(customer_id): {'next_date': next_month, 'base_amount': base_amount}
+                for customer_id, next_month, base_amount in zip(range(1, n_customers + 1), next_months, next_base_amounts.tolist())
+            }
+        })
+    return total
 
 # 2. FORECASTING DATA
-def generate_forecasting_data(n_reps=50):
+def generate_forecasting_data(n_reps=50, block_size=10_000):
     fieldnames = [
         'forecast_id', 'sales_rep_id', 'period', 'quota', 'pipeline_value', 
         'forecast_amount', 'probability_weighted_forecast', 'quota_attainment'
     ]
     
-    rows = []
-    forecast_id = 1
-    
     # Generate monthly forecasts for 3 years
-    start_date = datetime.now().date() - timedelta(days=3*365)
     end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=3*365)
     
-    for rep_id in range(1, n_reps + 1):
+    # Incremental runs resume from the next period with each rep's compounded quota
+    table_state = state.get('forecasting') if state else None
+    if table_state:
+        first_forecast_id = table_state['next_forecast_id']
+        saved = [table_state['reps'][str(rep_id)] for rep_id in range(1, n_reps + 1)]
+        start_date = parse_state_date(saved[0]['next_date'])  # Reps share one calendar
+        annual_quotas = np.array([rep['annual_quota'] for rep in saved])
+    else:
+        first_forecast_id = 1
         # Rep's base quota (annual, will be divided by 12 for monthly)
-        annual_quota = random.uniform(500000, 2000000)
-        monthly_quota = annual_quota / 12
-        
-        # Generate monthly forecasts
-        current_date = start_date.replace(day=1)  # Start of month
-        
-        while current_date <= end_date:
-            # Pipeline value varies throughout the month/quarter
-            pipeline_multiplier = random.uniform(1.5, 4.0)  # Pipeline typically 1.5-4x quota
-            pipeline_value = monthly_quota * pipeline_multiplier
-            
-            # Forecast amount (what rep thinks they'll close)
-            forecast_confidence = random.uniform(0.6, 1.2)
-            forecast_amount = monthly_quota * forecast_confidence
-            
-            # Probability weighted forecast (more conservative)
-            prob_weighted = forecast_amount * random.uniform(0.7, 0.9)
-            
-            # Quota attainment (for past periods only)
-            if current_date < datetime.now().date().replace(day=1):
-                # Historical performance
-                attainment = random.uniform(0.4, 1.5)  # 40% to 150% of quota
-                actual_quota_attainment = round(attainment, 3)
-            else:
-                # Future periods - no attainment yet
-                actual_quota_attainment = ''
+        annual_quotas = rng.uniform(500000, 2000000, n_reps)
+    
+    # Incremental runs stop at the last completed month; the current month is written,
+    # with its quota attainment, by the first run after it ends
+    grid_end = end_date.replace(day=1) - timedelta(days=1) if state else end_date
+    grid = PeriodGrid.monthly(start_date, grid_end, as_of=end_date)
+    n_periods = len(grid)
+    periods = grid.month_labels.tolist()
+    next_quotas = np.empty(n_reps)
+    
+    def forecast_blocks():
+        forecast_id = first_forecast_id
+        for first in range(0, n_reps, block_size):
+            block = slice(first, min(first + block_size, n_reps))
+            n_block = block.stop - block.start
+            shape = (n_block, n_periods)
             
-            # Period string
-            period = current_date.strftime('%Y-%m')
+            # Quota grows 5-15% at every new year
+            quotas, next_quotas[block] = grid.compound_by_year(rng, annual_quotas[block], 1.05, 1.15)
+            monthly_quota = quotas / 12
             
-            rows.append({
-                'forecast_id': forecast_id,
-                'sales_rep_id': rep_id,
-                'period': period,
-                'quota': round(monthly_quota, 2),
-                'pipeline_value': round(pipeline_value, 2),
-                'forecast_amount': round(forecast_amount, 2),
-                'probability_weighted_forecast': round(prob_weighted, 2),
-                'quota_attainment': actual_quota_attainment
-            })
+            # Pipeline typically 1.5-4x quota; forecast is what the rep thinks they'll close,
+            # and the probability weighted forecast is more conservative
+            pipeline_value = monthly_quota * rng.uniform(1.5, 4.0, shape)
+            forecast_amount = monthly_quota * rng.uniform(0.6, 1.2, shape)
+            prob_weighted = forecast_amount * rng.uniform(0.7, 0.9, shape)
             
-            forecast_id += 1
+            # Quota attainment (40% to 150%) for past periods only
+            attainment = np.round(rng.uniform(0.4, 1.5, shape), 3).astype(object)
+            attainment[:, ~grid.past] = ''
             
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-                # Annual quota adjustment
-                annual_quota *= random.uniform(1.05, 1.15)  # 5-15% growth
-                monthly_quota = annual_quota / 12
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+            n_rows = n_block * n_periods
+            yield [
+                range(forecast_id, forecast_id + n_rows),
+                np.repeat(np.arange(block.start + 1, block.stop + 1), n_periods).tolist(),
+                periods * n_block,
+                np.round(monthly_quota, 2).ravel().tolist(),
+                np.round(pipeline_value, 2).ravel().tolist(),
+                np.round(forecast_amount, 2).ravel().tolist(),
+                np.round(prob_weighted, 2).ravel().tolist(),
+                attainment.ravel().tolist()
+            ]
+            forecast_id += n_rows
     
-    write_csv('financial', 'forecasting', fieldnames, rows)
-    return rows
+    total = write_csv_blocks('financial', 'forecasting', fieldnames, forecast_blocks(), append=table_state is not None)
+    if state:
+        next_date = format_state_date(grid.next_start.item())
+        state.set('forecasting', {
+            'next_forecast_id': first_forecast_id + total,
+            'reps': {
+                str(rep_id): {'next_date': next_date, 'annual_quota': annual_quota}
+                for rep_id, annual_quota in zip(range(1, n_reps + 1), next_quotas.tolist())
+            }
+        })
+    return total
 
 # 3. TERRITORY AND CAPACITY PLANNING
-def generate_territory_planning_data(n_reps=50):
+def generate_territory_planning_data(n_reps=50, block_size=10_000):
     fieldnames = [
         'territory_id', 'sales_rep_id', 'territory_name', 'market_size', 
         'accounts_assigned', 'quota_assigned', 'productivity_score', 'coverage_ratio'
@@ -224,156 +248,134 @@ def generate_territory_planning_data(n_reps=50):
     territory_types = ['North America East', 'North America West', 'EMEA', 'APAC', 'LATAM', 
                       'Enterprise', 'Mid-Market', 'SMB', 'Federal', 'Healthcare']
     
-    rows = []
-    territory_id = 1
-    
-    # Generate quarterly territory data for 3 years
-    start_date = datetime.now().date() - timedelta(days=3*365)
+    # Generate quarterly (90-day) territory data for 3 years
     end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=3*365)
+    grid = PeriodGrid.every(90, start_date, end_date, as_of=end_date)
+    n_periods = len(grid)
+    years_elapsed = grid.year_index
     
-    for rep_id in range(1, n_reps + 1):
-        # Rep's territory assignment
-        territory_name = f"{random.choice(territory_types)} - {fake.state()}"
-        
-        # Base territory characteristics
-        base_market_size = random.uniform(10000000, 100000000)  # $10M - $100M market
-        base_accounts = random.randint(50, 500)
-        base_quota = random.uniform(500000, 2000000)
-        
-        # Generate quarterly data
-        current_date = start_date
-        quarter = 1
-        
-        while current_date <= end_date:
-            # Market size grows over time
-            market_size = base_market_size * (1 + (current_date.year - start_date.year) * 0.1)
+    def territory_blocks():
+        territory_id = 1
+        for first in range(0, n_reps, block_size):
+            block = range(first + 1, min(first + block_size, n_reps) + 1)
+            n_block = len(block)
+            shape = (n_block, n_periods)
             
-            # Accounts assigned (can change quarterly)
-            accounts_assigned = base_accounts + random.randint(-20, 20)
+            # Rep's territory assignment
+            territory_names = [f"{random.choice(territory_types)} - {fake.state()}" for _ in block]
+            
+            # Base territory characteristics
+            base_market_size = rng.uniform(10000000, 100000000, n_block)  # $10M - $100M market
+            base_accounts = rng.integers(50, 501, n_block)
+            base_quota = rng.uniform(500000, 2000000, n_block)
             
-            # Quota assigned (grows annually)
-            years_elapsed = (current_date.year - start_date.year)
-            quota_assigned = base_quota * (1.1 ** years_elapsed)  # 10% annual growth
+            # Market size grows 10% of its base per year; quota grows 10% annually
+            market_size = base_market_size[:, None] * (1 + years_elapsed * 0.1)
+            quota_assigned = base_quota[:, None] * (1.1 ** years_elapsed)
+            
+            # Accounts assigned (can change quarterly)
+            accounts_assigned = base_accounts[:, None] + rng.integers(-20, 21, shape)
             
             # Productivity score (0-100, based on performance)
-            productivity_score = random.uniform(60, 95)
+            productivity_score = rng.uniform(60, 95, shape)
             
             # Coverage ratio (accounts covered / total addressable accounts)
             total_addressable = market_size / 50000  # Assume $50K average account size
-            coverage_ratio = min(1.0, accounts_assigned / total_addressable)
+            coverage_ratio = np.minimum(1.0, accounts_assigned / total_addressable)
             
-            rows.append({
-                'territory_id': territory_id,
-                'sales_rep_id': rep_id,
-                'territory_name': territory_name,
-                'market_size': round(market_size, 2),
-                'accounts_assigned': accounts_assigned,
-                'quota_assigned': round(quota_assigned, 2),
-                'productivity_score': round(productivity_score, 1),
-                'coverage_ratio': round(coverage_ratio, 3)
-            })
-            
-            territory_id += 1
-            
-            # Move to next quarter
-            current_date += timedelta(days=90)
-            quarter += 1
+            n_rows = n_block * n_periods
+            yield [
+                range(territory_id, territory_id + n_rows),
+                np.repeat(np.array(block), n_periods).tolist(),
+                np.repeat(territory_names, n_periods).tolist(),
+                np.round(market_size, 2).ravel().tolist(),
+                accounts_assigned.ravel().tolist(),
+                np.round(quota_assigned, 2).ravel().tolist(),
+                np.round(productivity_score, 1).ravel().tolist(),
+                np.round(coverage_ratio, 3).ravel().tolist()
+            ]
+            territory_id += n_rows
     
-    write_csv('financial', 'territory_planning', fieldnames, rows)
-    return rows
+    return write_csv_blocks('financial', 'territory_planning', fieldnames, territory_blocks())
 
 # 4. COMPENSATION DATA
-def generate_compensation_data(n_reps=50):
+def generate_compensation_data(n_reps=50, block_size=10_000):
     fieldnames = [
         'comp_id', 'sales_rep_id', 'period', 'base_salary', 'commission_earned', 
         'quota_achievement', 'accelerator_rate', 'total_compensation'
     ]
     
-    rows = []
-    comp_id = 1
-    
     # Generate monthly compensation data for 3 years
-    start_date = datetime.now().date() - timedelta(days=3*365)
     end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=3*365)
+    grid = PeriodGrid.monthly(start_date, end_date, as_of=end_date)
+    n_periods = len(grid)
+    periods = grid.month_labels.tolist()
     
-    for rep_id in range(1, n_reps + 1):
-        # Rep's compensation structure
-        annual_base_salary = random.uniform(80000, 150000)
-        monthly_base = annual_base_salary / 12
-        
-        # Commission structure
-        base_commission_rate = random.uniform(0.02, 0.08)  # 2-8% of sales
-        
-        # Generate monthly compensation
-        current_date = start_date.replace(day=1)
-        
-        while current_date <= end_date:
-            # Only calculate for past periods
-            if current_date < datetime.now().date().replace(day=1):
-                # Quota achievement for the month
-                quota_achievement = random.uniform(0.3, 1.8)  # 30% to 180%
-                
-                # Commission calculation
-                monthly_quota = random.uniform(40000, 150000)  # Monthly quota
-                actual_sales = monthly_quota * quota_achievement
-                
-                # Base commission
-                commission_earned = actual_sales * base_commission_rate
-                
-                # Accelerator (bonus for over-achievement)
-                accelerator_rate = 1.0
-                if quota_achievement > 1.0:
-                    # Accelerated commission for over-achievement
-                    over_achievement = quota_achievement - 1.0
-                    accelerator_rate = 1.0 + (over_achievement * 0.5)  # 50% accelerator
-                    commission_earned *= accelerator_rate
-                
-                total_compensation = monthly_base + commission_earned
-                
-            else:
-                # Future periods - no data yet
-                quota_achievement = ''
-                commission_earned = 0
-                accelerator_rate = ''
-                total_compensation = monthly_base
+    def compensation_blocks():
+        comp_id = 1
+        for first in range(0, n_reps, block_size):
+            block = slice(first, min(first + block_size, n_reps))
+            n_block = block.stop - block.start
+            shape = (n_block, n_periods)
             
-            period = current_date.strftime('%Y-%m')
+            # Rep's compensation structure, with a 2-8% raise every new year
+            annual_base_salary, _ = grid.compound_by_year(rng, rng.uniform(80000, 150000, n_block), 1.02, 1.08)
+            monthly_base = annual_base_salary / 12
+            base_commission_rate = rng.uniform(0.02, 0.08, n_block)  # 2-8% of sales
             
-            rows.append({
-                'comp_id': comp_id,
-                'sales_rep_id': rep_id,
-                'period': period,
-                'base_salary': round(monthly_base, 2),
-                'commission_earned': round(commission_earned, 2) if commission_earned else 0,
-                'quota_achievement': round(quota_achievement, 3) if quota_achievement else '',
-                'accelerator_rate': round(accelerator_rate, 3) if accelerator_rate != '' else '',
-                'total_compensation': round(total_compensation, 2)
-            })
+            # Quota achievement for the month (30% to 180%) against a monthly quota
+            quota_achievement = rng.uniform(0.3, 1.8, shape)
+            monthly_quota = rng.uniform(40000, 150000, shape)
+            actual_sales = monthly_quota * quota_achievement
             
-            comp_id += 1
+            # Accelerated commission (50% accelerator) for over-achievement
+            accelerator_rate = np.where(quota_achievement > 1.0, 1.0 + (quota_achievement - 1.0) * 0.5, 1.0)
+            commission_earned = actual_sales * base_commission_rate[:, None] * accelerator_rate
             
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-                # Annual salary adjustment
-                annual_base_salary *= random.uniform(1.02, 1.08)  # 2-8% annual increase
-                monthly_base = annual_base_salary / 12
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+            # Only calculate for past periods; future periods have base salary only
+            past = np.broadcast_to(grid.past, shape)
+            commission_earned = np.where(past, np.round(commission_earned, 2), 0)
+            total_compensation = monthly_base + commission_earned
+            quota_achievement = np.round(quota_achievement, 3).astype(object)
+            quota_achievement[~past] = ''
+            accelerator_rate = np.round(accelerator_rate, 3).astype(object)
+            accelerator_rate[~past] = ''
+            
+            n_rows = n_block * n_periods
+            yield [
+                range(comp_id, comp_id + n_rows),
+                np.repeat(np.arange(block.start + 1, block.stop + 1), n_periods).tolist(),
+                periods * n_block,
+                np.round(monthly_base, 2).ravel().tolist(),
+                commission_earned.ravel().tolist(),
+                quota_achievement.ravel().tolist(),
+                accelerator_rate.ravel().tolist(),
+                np.round(total_compensation, 2).ravel().tolist()
+            ]
+            comp_id += n_rows
     
-    write_csv('financial', 'compensation', fieldnames, rows)
-    return rows
+    return write_csv_blocks('financial', 'compensation', fieldnames, compensation_blocks())
 
 # MAIN EXECUTION FOR FINANCIAL & OPERATIONAL DATA
 def generate_financial_operational_data():
     print("Generating Financial & Operational Data...")
     print("=" * 60)
     
-    # Generate all financial & operational tables
-    billing_and_invoicing = generate_billing_and_invoicing_data(4000)
-    forecasting = generate_forecasting_data(50)
-    territory_planning = generate_territory_planning_data(50)
-    compensation = generate_compensation_data(50)
+    if resuming:
+        # Snapshot tables were written by the first incremental run; only extend the time series
+        billing_and_invoicing = generate_billing_and_invoicing_data(4000)
+        forecasting = generate_forecasting_data(50)
+    else:
+        # Generate all financial & operational tables
+        billing_and_invoicing = generate_billing_and_invoicing_data(4000)
+        forecasting = generate_forecasting_data(50)
+        territory_planning = generate_territory_planning_data(50)
+        compensation = generate_compensation_data(50)
+    
+    if state:
+        state.save()
     
     print("=" * 60)
     print("Financial & Operational data generation complete!")
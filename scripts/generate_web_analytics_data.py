@@ -1,9 +1,11 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
 from faker import Faker
 import uuid
+from output_writers import PartitionedWriter, write_dataframe_csv
 
 # Set random seed for reproducibility
 np.random.seed(42)
@@ -202,7 +204,12 @@ def generate_media_events(visits_df):
 
     return pd.DataFrame(media_events)
 
-def main():
+def main(partitioned=None, compression=None):
+    """Generate all web analytics tables.
+
+    `partitioned` ('csv' or 'parquet') splits pageviews by month and
+    `compression` ('gzip' or 'zstd') compresses the CSV output.
+    """
     print("Generating datasets...")
 
     # Set date range for 2 years
@@ -238,10 +245,24 @@ def main():
     }
 
     for name, df in datasets.items():
+        if partitioned and name == 'pageviews':
+            # Pageviews is the largest table; lay it out as date=YYYY-MM partitions
+            table_dir = os.path.join(output_dir, f'web_analytics__{name}_{datetime.now().strftime("%m-%d")}')
+            with PartitionedWriter(table_dir, df.columns, 'timestamp', file_format=partitioned,
+                                   compression=compression) as writer:
+                writer.write_columns([df[column].tolist() for column in df.columns])
+            continue
         # Save as CSV
-        df.to_csv(os.path.join(output_dir, f'web_analytics__{name}_{datetime.now().strftime("%m-%d")}.csv'), index=False)
+        write_dataframe_csv(df, os.path.join(output_dir, f'web_analytics__{name}_{datetime.now().strftime("%m-%d")}.csv'),
+                            compression)
 
     print("Data generation complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate web analytics data")
+    parser.add_argument('--partitioned', nargs='?', const='csv', choices=['csv', 'parquet'],
+                        help="lay pageviews out as date=YYYY-MM partitions (csv or parquet)")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                        help="compress CSV output on a background thread pool")
+    args = parser.parse_args()
+    main(args.partitioned, args.compress)
\ No newline at end of file
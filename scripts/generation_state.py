@@ -0,0 +1,48 @@
+"""Persisted generator state for incremental revops runs.
+
+The revops time-series tables are generated relative to ``datetime.now()``.
+In incremental mode each generator records where it stopped (next date,
+evolving drift values, ID counters) in a small JSON file next to its output,
+so the following run only generates and appends the new days or months.
+"""
+import json
+import os
+from datetime import datetime
+
+
+class GenerationState:
+    """Per-table generator state loaded from and saved to a JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tables = {}
+        self.run_number = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self.tables = saved.get('tables', {})
+            self.run_number = saved.get('run_number', 0) + 1
+
+    def get(self, table_name):
+        """Return the saved state for a table, or None if it has never run."""
+        return self.tables.get(table_name)
+
+    def set(self, table_name, table_state):
+        self.tables[table_name] = table_state
+
+    def save(self):
+        # Write to a temp file first so an interrupted run never leaves a
+        # truncated state file behind.
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'run_number': self.run_number, 'tables': self.tables}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        print(f"Saved generator state to {self.path}")
+
+
+def format_state_date(value):
+    return value.strftime('%Y-%m-%d')
+
+
+def parse_state_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
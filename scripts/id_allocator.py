@@ -0,0 +1,131 @@
+"""Unique, random-looking business keys (claim ids, user ids, course codes, UUIDs).
+
+Drawing keys like ``CLM{randint(100000, 999999)}`` collides after about a
+thousand rows (birthday bound) and cannot produce more keys than the range
+holds. ``IdAllocator`` instead numbers rows with a plain counter and passes
+it through a keyed Feistel network, a bijection on ``[0, 10**width)``, so
+every counter value maps to a distinct fixed-width number that doesn't look
+sequential. Its only state is the key and the counter position, and
+workers can split the counter range with ``shard`` and still never collide.
+``keyed_uuids`` does the same for UUID columns: the UUID of a position is a
+keyed hash of it, so entities drawn by index (policies, adjusters) get the
+same id in every block without keeping a table of generated UUIDs.
+"""
+import numpy as np
+
+FEISTEL_ROUNDS = 4
+
+# Positions of the 32 hex digits in the 36-character UUID text form
+UUID_HEX_COLUMNS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+
+def _seed(key):
+    """Integer seed for an integer or string key."""
+    return int.from_bytes(key.encode(), 'little') if isinstance(key, str) else key
+
+
+def _mix(values):
+    """splitmix64 finalizer, applied elementwise to a uint64 array."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+class IdAllocator:
+    """
+    Allocator of unique ``prefix`` + zero-padded ``width``-digit ids.
+
+    Args:
+        prefix: Text put in front of every id, e.g. 'CLM' or 'U-'
+        width: Number of digits; the allocator holds 10**width ids
+        key: Integer or string key selecting the permutation, e.g. the column name
+        start: First counter position handed out
+        stop: Counter position to stop before (default: 10**width)
+    """
+
+    def __init__(self, prefix, width, key=0, start=0, stop=None):
+        self.prefix = prefix
+        self.width = width
+        self.key = key
+        self.capacity = 10 ** width
+        self.position = start
+        self.stop = self.capacity if stop is None else stop
+        if not 0 <= start <= self.stop <= self.capacity:
+            raise ValueError(f"Counter range [{start}, {stop}) doesn't fit in {width} digits")
+
+        # Balanced Feistel over the smallest even number of bits covering the id space
+        bits = max(2, int(self.capacity - 1).bit_length())
+        self.half_bits = np.uint64((bits + 1) // 2)
+        self.half_mask = np.uint64((1 << int(self.half_bits)) - 1)
+        self.round_shift = np.uint64(64) - self.half_bits
+        self.round_keys = np.random.SeedSequence(_seed(key)).generate_state(FEISTEL_ROUNDS, dtype=np.uint64)
+
+    @classmethod
+    def for_count(cls, prefix, count, min_width, key=0):
+        """Allocator with at least ``min_width`` digits and room for ``count`` ids."""
+        width = max(min_width, len(str(max(count - 1, 0))))
+        return cls(prefix, width, key)
+
+    def __len__(self):
+        """Number of ids still available."""
+        return self.stop - self.position
+
+    def _permute(self, values):
+        left = values >> self.half_bits
+        right = values & self.half_mask
+        for round_key in self.round_keys:
+            left, right = right, left ^ (_mix(right ^ round_key) >> self.round_shift)
+        return (left << self.half_bits) | right
+
+    def numbers(self, positions):
+        """Permuted numbers for counter ``positions``, all in ``[0, 10**width)``."""
+        numbers = self._permute(np.asarray(positions, dtype=np.uint64))
+        # Cycle-walk values that land past the decimal range back into it
+        outside = numbers >= np.uint64(self.capacity)
+        while outside.any():
+            numbers[outside] = self._permute(numbers[outside])
+            outside = numbers >= np.uint64(self.capacity)
+        return numbers.astype(np.int64)
+
+    def format(self, numbers):
+        """Ids (object array of strings) for permuted ``numbers``."""
+        digits = np.char.zfill(np.asarray(numbers).astype(str), self.width)
+        return self.prefix + digits.astype(object)
+
+    def take(self, n):
+        """Next ``n`` ids as an object array of strings."""
+        if n > len(self):
+            raise ValueError(f"Only {len(self)} '{self.prefix}' ids left, {n} requested")
+        positions = np.arange(self.position, self.position + n, dtype=np.uint64)
+        self.position += n
+        return self.format(self.numbers(positions))
+
+    def shard(self, index, n_shards):
+        """Allocator over shard ``index`` of ``n_shards`` equal slices of the remaining counter range."""
+        remaining = len(self)
+        start = self.position + remaining * index // n_shards
+        stop = self.position + remaining * (index + 1) // n_shards
+        return IdAllocator(self.prefix, self.width, self.key, start, stop)
+
+
+def keyed_uuids(positions, key):
+    """
+    Version-4 style UUID strings determined by ``key`` and integer ``positions``.
+
+    Each half of the UUID is a bijective 64-bit hash of the position, so
+    distinct positions give distinct UUIDs apart from the six fixed
+    version/variant bits.
+    """
+    half_keys = np.random.SeedSequence(_seed(key)).generate_state(2, dtype=np.uint64)
+    positions = np.asarray(positions, dtype=np.uint64)
+    words = np.stack([_mix(positions ^ half_keys[0]), _mix(positions ^ half_keys[1])], axis=1)
+    raw = words.astype('>u8').view(np.uint8).reshape(-1, 16)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    text = np.full((len(raw), 36), ord('-'), dtype=np.uint8)
+    text[:, UUID_HEX_COLUMNS[0::2]] = HEX_DIGITS[raw >> 4]
+    text[:, UUID_HEX_COLUMNS[1::2]] = HEX_DIGITS[raw & 0x0F]
+    return text.view('S36').ravel().astype(str).astype(object)
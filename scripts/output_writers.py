@@ -0,0 +1,405 @@
+"""Shared output writers for the large time-series tables.
+
+``PartitionedWriter`` lays a table out Hive-style as rows are generated::
+
+    <table_dir>/date=2024-05/part-0.csv
+    <table_dir>/date=2024-06/part-0.csv
+
+so query engines can prune by date. Rows are buffered per partition (bounded
+by ``buffer_rows`` per partition and ``max_buffered_rows`` overall) and flushed
+through a small LRU pool of open files. Independent workers can generate the
+same table in parallel by giving each writer its own ``part_id``.
+
+``open_output`` returns a text stream for any CSV sink, optionally wrapped in
+a ``CompressedWriter`` that gzip/zstd-compresses fixed-size blocks on a shared
+thread pool while the generator keeps producing rows.
+
+``write_csv_columns`` serializes a whole block of columns at once, producing
+the same text as ``csv.writer`` without its per-row and per-field overhead.
+
+``write_csv_blocks`` and ``write_csv`` write a whole RevOps table
+(``revops_<subdomain>_<table>.csv`` or its date partitions) from column
+blocks or rows; generators bind them to their output directory and options.
+"""
+import csv
+import glob
+import gzip
+import os
+import re
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+# Length of the partition value taken from an ISO date/datetime string
+PARTITION_KEY_LENGTHS = {'month': 7, 'day': 10}
+
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+COMPRESSION_WORKERS = min(8, os.cpu_count() or 1)
+
+_compression_pool = None
+
+
+def get_compression_pool():
+    """Thread pool shared by every CompressedWriter in the process."""
+    global _compression_pool
+    if _compression_pool is None:
+        _compression_pool = ThreadPoolExecutor(max_workers=COMPRESSION_WORKERS, thread_name_prefix='compress')
+    return _compression_pool
+
+
+def block_compressor(compression, level=None):
+    """Return a function compressing one bytes block into a standalone gzip member or zstd frame."""
+    if compression == 'gzip':
+        level = 6 if level is None else level
+        return lambda block: gzip.compress(block, compresslevel=level, mtime=0)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd output requires zstandard (pip install zstandard)") from e
+        level = 3 if level is None else level
+        # ZstdCompressor isn't thread-safe, so each block gets its own
+        return lambda block: zstandard.ZstdCompressor(level=level).compress(block)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+class CompressedWriter:
+    """
+    Text stream that compresses its output in blocks on a background thread pool.
+
+    Every ``block_size`` characters are encoded and handed to the shared pool;
+    compressed blocks are written to disk in order as they complete. Each block
+    is an independent gzip member or zstd frame, and concatenated they form a
+    valid .gz/.zst file, so appending to an existing file also works. zlib and
+    zstd release the GIL, so compression overlaps with row generation.
+    """
+
+    def __init__(self, path, compression='gzip', mode='w', level=None, block_size=4 << 20):
+        self.file = open(path, 'ab' if mode == 'a' else 'wb')
+        self.compress = block_compressor(compression, level)
+        self.pool = get_compression_pool()
+        self.max_pending = 2 * COMPRESSION_WORKERS  # Bounds memory held by in-flight blocks
+        self.block_size = block_size
+        self.pending = deque()
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.block_size:
+            self._submit_block()
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.buffered:
+            self._submit_block()
+        while self.pending:
+            self.file.write(self.pending.popleft().result())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _submit_block(self):
+        block = ''.join(self.buffer).encode('utf-8')
+        self.buffer = []
+        self.buffered = 0
+        self.pending.append(self.pool.submit(self.compress, block))
+        # Write finished blocks in order; wait on the oldest only when too many are in flight
+        while self.pending and (len(self.pending) > self.max_pending or self.pending[0].done()):
+            self.file.write(self.pending.popleft().result())
+
+
+# Characters that make csv.writer (QUOTE_MINIMAL) quote a field
+CSV_SPECIAL_CHARS = re.compile(r'[,"\r\n]')
+
+
+def format_csv_column(values):
+    """CSV field text for one column, matching csv.writer: None -> '', quoted only when needed."""
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    fields = ['' if value is None else str(value) for value in values] if None in values else list(map(str, values))
+    # One scan over the joined column decides whether any field needs quoting at all
+    if CSV_SPECIAL_CHARS.search(''.join(fields)):
+        fields = ['"' + field.replace('"', '""') + '"' if CSV_SPECIAL_CHARS.search(field) else field
+                  for field in fields]
+    return fields
+
+
+def write_csv_columns(f, columns, lineterminator='\r\n'):
+    """Write a block given as one sequence per field to a text stream; returns the row count."""
+    formatted = [format_csv_column(values) for values in columns]
+    if len(formatted) == 1:
+        # A row holding one empty field would be a blank line, so csv.writer quotes it
+        formatted[0] = ['""' if field == '' else field for field in formatted[0]]
+    n_rows = len(formatted[0]) if formatted else 0
+    if n_rows:
+        f.write(lineterminator.join(map(','.join, zip(*formatted))) + lineterminator)
+    return n_rows
+
+
+def output_path(path, compression=None):
+    """Add the compressed-file extension (.gz/.zst) to an output path."""
+    return path + COMPRESSION_EXTENSIONS[compression] if compression else path
+
+
+def open_output(path, mode='w', compression=None):
+    """Open a CSV sink for writing, compressing in the background when requested."""
+    if compression:
+        return CompressedWriter(path, compression, mode=mode)
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+def count_csv_records(path):
+    """Number of data rows in a (possibly .gz/.zst compressed) CSV file with a header."""
+    if path.endswith('.gz'):
+        f = gzip.open(path, 'rt', newline='', encoding='utf-8')
+    elif path.endswith('.zst'):
+        import io
+        import zstandard
+        f = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True),
+                             newline='', encoding='utf-8')
+    else:
+        f = open(path, newline='', encoding='utf-8')
+    with f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def format_date_object_columns(df):
+    """
+    Copy of ``df`` with columns of ``datetime.date`` objects turned into ISO strings.
+
+    ``to_csv`` would otherwise call ``str()`` on every cell of those object columns;
+    converting through datetime64 formats a whole column in one NumPy call.
+    """
+    import numpy as np
+    import pandas as pd
+
+    converted = {}
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        first = values.first_valid_index()
+        sample = None if first is None else values[first]
+        if isinstance(sample, date) and not isinstance(sample, datetime):
+            days = pd.to_datetime(values).to_numpy().astype('datetime64[D]')
+            converted[column] = np.where(np.isnat(days), '', np.datetime_as_string(days))
+    return df.assign(**converted) if converted else df
+
+
+def write_dataframe_csv(df, path, compression=None, date_format=None):
+    """
+    ``df.to_csv`` through ``open_output``; returns the path actually written.
+
+    ``date_format`` is passed to ``to_csv`` for datetime64 columns; columns of
+    ``datetime.date`` objects are always written as YYYY-MM-DD.
+    """
+    path = output_path(path, compression)
+    with open_output(path, compression=compression) as f:
+        format_date_object_columns(df).to_csv(f, index=False, date_format=date_format)
+    return path
+
+
+class PartitionedWriter:
+    """Write rows into ``<table_dir>/<partition_name>=<value>/part-<part_id>[-<n>]`` files.
+
+    The partition value is the leading month (or day) of ``partition_column``,
+    which may hold ISO date strings, dates or timestamps.
+    """
+
+    def __init__(self, table_dir, fieldnames, partition_column, partition_name='date', granularity='month',
+                 file_format='csv', compression=None, part_id=0, append=False, max_open_files=32,
+                 buffer_rows=10000, max_buffered_rows=200000):
+        if granularity not in PARTITION_KEY_LENGTHS:
+            raise ValueError(f"Unknown partition granularity: {granularity}")
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unknown file format: {file_format}")
+        if file_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+        self.table_dir = table_dir
+        self.fieldnames = list(fieldnames)
+        self.partition_index = self.fieldnames.index(partition_column)
+        self.partition_name = partition_name
+        self.key_length = PARTITION_KEY_LENGTHS[granularity]
+        self.file_format = file_format
+        self.compression = compression
+        self.part_id = part_id
+        self.append = append
+        self.max_open_files = max_open_files
+        self.buffer_rows = buffer_rows
+        self.max_buffered_rows = max_buffered_rows
+
+        self.buffers = defaultdict(list)
+        self.buffered_rows = 0
+        self.open_files = OrderedDict()  # partition -> open file, least recently used first
+        self.touched = set()  # partitions written to by this writer
+        self.parquet_parts = defaultdict(int)
+        self.row_count = 0
+        os.makedirs(table_dir, exist_ok=True)
+
+    def write_rows(self, rows):
+        """Buffer dict rows keyed by fieldnames."""
+        self.write_tuples([row[name] for name in self.fieldnames] for row in rows)
+
+    def write_columns(self, columns):
+        """Buffer a block given as one sequence per fieldname."""
+        self.write_tuples(zip(*columns))
+
+    def write_tuples(self, rows):
+        """Buffer rows given as sequences in fieldname order."""
+        index, key_length = self.partition_index, self.key_length
+        for row in rows:
+            partition = str(row[index])[:key_length]
+            buffer = self.buffers[partition]
+            buffer.append(row)
+            self.buffered_rows += 1
+            if len(buffer) >= self.buffer_rows:
+                self._flush_partition(partition)
+        if self.buffered_rows >= self.max_buffered_rows:
+            self.flush()
+
+    def flush(self):
+        for partition in list(self.buffers):
+            self._flush_partition(partition)
+
+    def close(self):
+        self.flush()
+        for f in self.open_files.values():
+            f.close()
+        self.open_files.clear()
+        print(f"Wrote {self.row_count} records to {len(self.touched)} partitions under {self.table_dir}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _partition_dir(self, partition):
+        path = os.path.join(self.table_dir, f"{self.partition_name}={partition}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _flush_partition(self, partition):
+        rows = self.buffers.pop(partition, None)
+        if not rows:
+            return
+        self.buffered_rows -= len(rows)
+        self.row_count += len(rows)
+        if self.file_format == 'parquet':
+            self._write_parquet(partition, rows)
+        else:
+            write_csv_columns(self._csv_file(partition), list(zip(*rows)))
+        self.touched.add(partition)
+
+    def _csv_file(self, partition):
+        if partition in self.open_files:
+            self.open_files.move_to_end(partition)
+            return self.open_files[partition]
+
+        if len(self.open_files) >= self.max_open_files:
+            _, oldest = self.open_files.popitem(last=False)
+            oldest.close()
+
+        path = os.path.join(self._partition_dir(partition), f"part-{self.part_id}.csv")
+        path = output_path(path, self.compression)
+        # Truncate on first touch unless appending; reopen in append mode after eviction
+        reuse = self.append or partition in self.touched
+        write_header = not (reuse and os.path.exists(path) and os.path.getsize(path) > 0)
+        f = open_output(path, 'a' if reuse else 'w', self.compression)
+        if write_header:
+            write_csv_columns(f, [[name] for name in self.fieldnames])
+        self.open_files[partition] = f
+        return f
+
+    def _write_parquet(self, partition, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        partition_dir = self._partition_dir(partition)
+        if partition not in self.touched and not self.append:
+            for stale in glob.glob(os.path.join(partition_dir, f"part-{self.part_id}-*.parquet")):
+                os.remove(stale)
+        elif partition not in self.parquet_parts and self.append:
+            self.parquet_parts[partition] = len(glob.glob(os.path.join(partition_dir, f"part-{self.part_id}-*.parquet")))
+
+        # Parquet files can't be appended to, so every flush is a new part file
+        n = self.parquet_parts[partition]
+        self.parquet_parts[partition] += 1
+        # Blank CSV cells become nulls so optional numeric columns keep a single type
+        table = pa.table({
+            name: [None if value == '' else value for value in values]
+            for name, values in zip(self.fieldnames, zip(*rows))
+        })
+        pq.write_table(table, os.path.join(partition_dir, f"part-{self.part_id}-{n}.parquet"))
+
+
+def partitioned_writer(output_dir, subdomain, table_name, fieldnames, partition_column, append=False,
+                       partitioned='csv', compression=None):
+    """PartitionedWriter for the ``revops_<subdomain>_<table_name>`` table under ``output_dir``."""
+    table_dir = f"{output_dir}/revops_{subdomain}_{table_name}"
+    return PartitionedWriter(table_dir, fieldnames, partition_column, file_format=partitioned,
+                             compression=compression, append=append)
+
+
+def write_csv_blocks(output_dir, subdomain, table_name, fieldnames, blocks, append=False, partition_column=None,
+                     partitioned=None, compression=None):
+    """
+    Stream a table given as blocks of columns (one sequence per fieldname); returns the row count.
+
+    The table goes to ``<output_dir>/revops_<subdomain>_<table_name>.csv``, or into
+    date partitions of ``partition_column`` when ``partitioned`` names a file format
+    ('csv' or 'parquet').
+    """
+    if partition_column and partitioned:
+        with partitioned_writer(output_dir, subdomain, table_name, fieldnames, partition_column, append,
+                                partitioned, compression) as writer:
+            for columns in blocks:
+                writer.write_columns(columns)
+        return writer.row_count
+    filename = output_path(f"{output_dir}/revops_{subdomain}_{table_name}.csv", compression)
+    total = 0
+    with open_output(filename, 'a' if append else 'w', compression) as f:
+        if not append:
+            write_csv_columns(f, [[name] for name in fieldnames])
+        for columns in blocks:
+            total += write_csv_columns(f, columns)
+    print(f"{'Appended to' if append else 'Wrote'} {filename} with {total} records")
+    return total
+
+
+def write_csv(output_dir, subdomain, table_name, fieldnames, rows, append=False, partition_column=None,
+              partitioned=None, compression=None):
+    """
+    Write a list of row dicts (or a RowBuffer) like ``write_csv_blocks``; returns the row count.
+
+    Rows follow the ``csv.DictWriter`` contract: missing fields are written
+    empty and a key outside ``fieldnames`` raises ValueError.
+    """
+    # Column-stored rows (RowBuffer) are written straight from their columns
+    if hasattr(rows, 'column_blocks'):
+        return write_csv_blocks(output_dir, subdomain, table_name, fieldnames, rows.column_blocks(fieldnames),
+                                append, partition_column, partitioned, compression)
+    known = set(fieldnames)
+
+    # Serialize whole column batches instead of one DictWriter call per row
+    def row_blocks(block_size=100_000):
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            unexpected = {key for row in block for key in row} - known
+            if unexpected:
+                raise ValueError(f"dict contains fields not in fieldnames: {', '.join(map(repr, sorted(unexpected)))}")
+            yield [[row.get(name, '') for row in block] for name in fieldnames]
+    return write_csv_blocks(output_dir, subdomain, table_name, fieldnames, row_blocks(), append,
+                            partition_column, partitioned, compression)
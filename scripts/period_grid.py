@@ -0,0 +1,76 @@
+"""Entity x period grids for per-rep calendars (forecasts, territories, comp).
+
+Tables like forecasting and compensation give every sales rep one row per
+month (or quarter) over the same window. ``PeriodGrid`` builds that calendar
+once as a datetime64 array, so per-rep values become (entities x periods)
+matrices: annual compounding is a ``cumprod`` over year boundaries and
+past/future splits are a mask against one fixed as-of date. Flattening a
+matrix row-major yields entity-major, period-ascending rows.
+"""
+import numpy as np
+
+from calendar_strings import format_dates, format_months
+
+
+class PeriodGrid:
+    """
+    Calendar of consecutive periods shared by every entity.
+
+    Args:
+        starts: Period start dates (anything np.datetime64 accepts), ascending
+        next_start: Start of the period after the last one, i.e. the end of the grid
+        as_of: Date the data is generated as of; periods ending on or before it are past
+    """
+
+    def __init__(self, starts, next_start, as_of):
+        self.starts = np.asarray(starts, dtype='datetime64[D]')
+        self.next_start = np.datetime64(next_start, 'D')
+        self.as_of = np.datetime64(as_of, 'D')
+        ends = np.append(self.starts[1:], self.next_start)[:len(self.starts)]
+        self.past = ends <= self.as_of
+
+        years = self.starts.astype('datetime64[Y]').astype(int)
+        next_year = int(self.next_start.astype('datetime64[Y]').astype(int))
+        first_year = years[0] if len(years) else next_year
+        self.year_index = years - first_year
+        self.next_year_index = next_year - first_year
+
+    @classmethod
+    def monthly(cls, start, end, as_of):
+        """Calendar months from the month of ``start`` through the month of ``end``."""
+        months = np.arange(np.datetime64(start, 'M'), np.datetime64(end, 'M') + 1)
+        return cls(months, max(np.datetime64(start, 'M'), np.datetime64(end, 'M') + 1), as_of)
+
+    @classmethod
+    def every(cls, days, start, end, as_of):
+        """Periods of ``days`` days starting at ``start``, up to and including ``end``."""
+        start = np.datetime64(start, 'D')
+        starts = np.arange(start, np.datetime64(end, 'D') + 1, days)
+        return cls(starts, starts[-1] + days if len(starts) else start, as_of)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def labels(self):
+        """ISO dates of the period starts."""
+        return format_dates(self.starts)
+
+    @property
+    def month_labels(self):
+        """'YYYY-MM' labels of the period starts."""
+        return format_months(self.starts)
+
+    def compound_by_year(self, rng, initial, growth_low, growth_high):
+        """
+        Grow each entity's ``initial`` value by a random annual factor at every year boundary.
+
+        Returns:
+            tuple: ((entities x periods) matrix of values, value in the period after the grid)
+        """
+        initial = np.asarray(initial, dtype=float)
+        n_years = max(self.next_year_index, int(self.year_index.max()) if len(self) else 0) + 1
+        growth = rng.uniform(growth_low, growth_high, (initial.size, n_years - 1))
+        factors = np.hstack([np.ones((initial.size, 1)), np.cumprod(growth, axis=1)])
+        values = initial[:, None] * factors
+        return values[:, self.year_index], values[:, self.next_year_index]
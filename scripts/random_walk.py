@@ -0,0 +1,46 @@
+"""Vectorized random walks for per-entity metrics that drift period over period.
+
+Several revops generators evolve a base value per customer (health scores,
+invoice amounts) with a small random step every month. Rather than looping
+customer by customer, these helpers draw every step at once and accumulate
+them with ``cumsum``/``cumprod`` over an (entities x periods) matrix.
+
+Entities start in different periods, so trajectories are ragged: row ``i``
+holds the walk in periods relative to that entity's own start, and
+``ragged_mask`` marks the first ``lengths[i]`` cells as real observations.
+Flattening ``matrix[mask]`` yields entity-major, period-ascending rows.
+"""
+import numpy as np
+
+
+def ragged_mask(lengths, width=None):
+    """Boolean (entities x width) mask, True for the first lengths[i] cells of row i."""
+    lengths = np.asarray(lengths)
+    if width is None:
+        width = int(lengths.max()) if lengths.size else 0
+    return np.arange(width) < lengths[:, None]
+
+
+def random_walk(rng, initial, step_low, step_high, n_periods, multiplicative=False):
+    """
+    Generate one trajectory per entity in a single matrix operation.
+
+    Column 0 holds ``initial``; every later column applies a uniform step in
+    ``[step_low, step_high)`` to the previous one, added to it by default or
+    multiplied into it when ``multiplicative`` is set (compounding growth).
+
+    Returns:
+        np.ndarray: (entities x n_periods) float matrix
+    """
+    initial = np.asarray(initial, dtype=float)
+    steps = rng.uniform(step_low, step_high, (initial.size, max(n_periods - 1, 0)))
+    if multiplicative:
+        growth = np.cumprod(steps, axis=1)
+        return initial[:, None] * np.hstack([np.ones((initial.size, 1)), growth])[:, :n_periods]
+    drift = np.cumsum(steps, axis=1)
+    return initial[:, None] + np.hstack([np.zeros((initial.size, 1)), drift])[:, :n_periods]
+
+
+def values_at(matrix, lengths):
+    """Value of each row at column lengths[i], i.e. the walk one step past its last observation."""
+    return matrix[np.arange(matrix.shape[0]), np.asarray(lengths)]
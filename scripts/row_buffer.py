@@ -0,0 +1,111 @@
+"""Compact storage for tables that are still generated one row at a time.
+
+A list of dicts costs several hundred bytes per row: every dict carries its
+own hash table and references to the same key strings. ``RowBuffer`` keeps
+one column per field instead, numeric fields packed into ``array.array``
+buffers (8 bytes or less per value) and everything else in plain lists.
+Rows are appended as dicts or positional values and read back as
+``RowView`` objects, which behave like read-only dicts, so a buffer can be
+passed anywhere a list of row dicts was (``csv.DictWriter``,
+``PartitionedWriter.write_rows``). Writers that know about buffers can skip
+the views entirely and take ``column_blocks``.
+"""
+from array import array
+
+
+class RowView:
+    """Read-only, dict-like view of one row of a RowBuffer."""
+    __slots__ = ('_buffer', '_index')
+
+    def __init__(self, buffer, index):
+        self._buffer = buffer
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._buffer.columns[name][self._index]
+
+    def get(self, name, default=None):
+        column = self._buffer.columns.get(name)
+        return default if column is None else column[self._index]
+
+    def keys(self):
+        # A set-like view, as dict.keys() is (csv.DictWriter subtracts it from fieldnames)
+        return dict.fromkeys(self._buffer.fieldnames).keys()
+
+    def __iter__(self):
+        return iter(self._buffer.fieldnames)
+
+    def __len__(self):
+        return len(self._buffer.fieldnames)
+
+    def __repr__(self):
+        return repr({name: self[name] for name in self._buffer.fieldnames})
+
+
+class RowBuffer:
+    """
+    Append-only table stored column by column.
+
+    Args:
+        fieldnames: Column names, in row order
+        typecodes: Optional ``array.array`` typecode per numeric column (e.g. 'l' for
+            integers, 'd' for floats); other columns are stored as lists
+    """
+
+    def __init__(self, fieldnames, typecodes=None):
+        self.fieldnames = list(fieldnames)
+        self.typecodes = dict(typecodes or {})
+        self.columns = {
+            name: array(self.typecodes[name]) if name in self.typecodes else []
+            for name in self.fieldnames
+        }
+        self._appenders = [self.columns[name].append for name in self.fieldnames]
+
+    @classmethod
+    def from_columns(cls, fieldnames, columns, typecodes=None):
+        """Buffer holding ``columns``, one sequence per fieldname."""
+        buffer = cls(fieldnames, typecodes)
+        buffer.extend_columns(columns)
+        return buffer
+
+    def append(self, row):
+        """Append a row given as a dict keyed by fieldnames."""
+        for name, append in zip(self.fieldnames, self._appenders):
+            append(row[name])
+
+    def append_values(self, *values):
+        """Append a row given as values in fieldname order."""
+        for value, append in zip(values, self._appenders):
+            append(value)
+
+    def extend_columns(self, columns):
+        """Append a block of rows given as one sequence per fieldname."""
+        for name, values in zip(self.fieldnames, columns):
+            self.columns[name].extend(values)
+
+    def __len__(self):
+        return len(self.columns[self.fieldnames[0]]) if self.fieldnames else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RowBuffer.from_columns(self.fieldnames, [self.columns[name][index] for name in self.fieldnames],
+                                          self.typecodes)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RowBuffer index out of range")
+        return RowView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield RowView(self, index)
+
+    def columns_in(self, fieldnames=None):
+        """The stored columns in ``fieldnames`` order (default: all fields)."""
+        return [self.columns[name] for name in (fieldnames or self.fieldnames)]
+
+    def column_blocks(self, fieldnames=None, block_size=100_000):
+        """Yield the rows as blocks of columns in ``fieldnames`` order (default: all fields)."""
+        columns = self.columns_in(fieldnames)
+        for start in range(0, len(self), block_size):
+            yield [column[start:start + block_size] for column in columns]
@@ -0,0 +1,138 @@
+"""Reusable samplers for weighted and parent-dependent categorical columns.
+
+``random.choices(values, weights=...)[0]`` rebuilds the cumulative weights on
+every call, which adds up in generators that draw once per row. A
+``CategoricalSampler`` is built once per distribution (Vose alias tables) and
+then returns single draws in O(1) or whole columns as NumPy arrays.
+``HierarchicalSampler`` does the same for child columns whose options depend
+on a parent column (loss category -> subcategory, component -> brand).
+"""
+import random
+
+import numpy as np
+
+
+class CategoricalSampler:
+    """
+    Weighted categorical distribution over ``values``.
+
+    Args:
+        values: Categories to draw from
+        weights: Relative weights (uniform when omitted); need not sum to 1
+        skew: Optional power-law skew applied by position, weight_i * (i + 1) ** -skew,
+            to model "hot" keys (accounts, pages) where a few values dominate
+    """
+
+    def __init__(self, values, weights=None, skew=0.0):
+        self.values = list(values)
+        n = len(self.values)
+        if n == 0:
+            raise ValueError("CategoricalSampler needs at least one value")
+        weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+        if len(weights) != n:
+            raise ValueError("values and weights must have the same length")
+        if skew:
+            weights = weights * np.arange(1, n + 1, dtype=float) ** -skew
+        self.probabilities = weights / weights.sum()
+        self._value_array = np.empty(n, dtype=object)
+        self._value_array[:] = self.values
+
+        # Vose's alias method: each slot keeps its own value with probability
+        # prob[i] and otherwise falls through to alias[i]
+        scaled = self.probabilities * n
+        prob = np.ones(n)
+        alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self._prob = prob
+        self._alias = alias
+        self._prob_list = prob.tolist()
+        self._alias_list = alias.tolist()
+
+    @classmethod
+    def zipf(cls, values, exponent=1.0):
+        """Power-law distribution where the i-th value has weight (i + 1) ** -exponent."""
+        return cls(values, skew=exponent)
+
+    def sample(self, random_fn=random.random):
+        """Draw a single value in O(1); uses the seeded ``random`` module by default."""
+        u = random_fn() * len(self._prob_list)
+        i = int(u)
+        return self.values[i if u - i < self._prob_list[i] else self._alias_list[i]]
+
+    def sample_indices(self, rng, size):
+        """Draw ``size`` category indices with a NumPy Generator."""
+        slots = rng.integers(0, len(self.values), size)
+        keep = rng.random(size) < self._prob[slots]
+        return np.where(keep, slots, self._alias[slots])
+
+    def sample_array(self, rng, size):
+        """Draw ``size`` values as an array (object dtype, so mixed types survive)."""
+        return self._value_array[self.sample_indices(rng, size)]
+
+
+class HierarchicalSampler:
+    """
+    Child categories that depend on a parent category, drawn for many rows at once.
+
+    Each parent's options are flattened into one array with per-parent offsets
+    and lengths, so a child is ``offsets[parent] + draw`` and a whole column of
+    children needs a single vectorized pass instead of one call per row.
+
+    Args:
+        options: Mapping of parent value to its list of child values
+        weights: Optional mapping of parent value to relative child weights (uniform
+            when omitted, or for parents missing from the mapping)
+    """
+
+    def __init__(self, options, weights=None):
+        self.parents = list(options)
+        if not self.parents or any(len(options[parent]) == 0 for parent in self.parents):
+            raise ValueError("HierarchicalSampler needs at least one child for every parent")
+        weights = weights or {}
+        self._parent_lookup = {parent: i for i, parent in enumerate(self.parents)}
+        self.lengths = np.array([len(options[parent]) for parent in self.parents])
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)[:-1]])
+        self.children = np.empty(int(self.lengths.sum()), dtype=object)
+        self.children[:] = [child for parent in self.parents for child in options[parent]]
+
+        # Weighted parents draw by inverse CDF; each parent's CDF is shifted by its
+        # index so one searchsorted over the flat array stays inside the right segment
+        self._weighted = bool(weights)
+        if self._weighted:
+            cdf = []
+            for i, parent in enumerate(self.parents):
+                w = np.asarray(weights.get(parent, np.ones(self.lengths[i])), dtype=float)
+                if len(w) != self.lengths[i]:
+                    raise ValueError(f"Weights for {parent!r} don't match its options")
+                cdf.append(i + np.cumsum(w) / w.sum())
+            self._cdf = np.concatenate(cdf)
+
+    def parent_indices(self, parent_values):
+        """Index into ``parents`` for each value of a parent column."""
+        values, inverse = np.unique(np.asarray(parent_values, dtype=object), return_inverse=True)
+        lookup = np.array([self._parent_lookup[value] for value in values], dtype=np.int64)
+        return lookup[inverse.ravel()]
+
+    def sample_indices(self, rng, parent_indices):
+        """Flat child index for each parent index, drawn with ``rng`` (anything with .random)."""
+        parent_indices = np.asarray(parent_indices, dtype=np.int64)
+        u = rng.random(parent_indices.shape)
+        if self._weighted:
+            flat = np.searchsorted(self._cdf, parent_indices + u, side='right')
+            return np.minimum(flat, self.offsets[parent_indices] + self.lengths[parent_indices] - 1)
+        return self.offsets[parent_indices] + (u * self.lengths[parent_indices]).astype(np.int64)
+
+    def sample(self, rng, parent_indices):
+        """Child values (object array) for each parent index."""
+        return self.children[self.sample_indices(rng, parent_indices)]
+
+    def sample_for(self, rng, parent_values):
+        """Child values for a column of parent values rather than indices."""
+        return self.sample(rng, self.parent_indices(parent_values))
@@ -0,0 +1,41 @@
+"""Segmented array operations for ragged per-entity sequences.
+
+Many generators produce a variable number of child rows per parent (touches
+per lead, scores per lead, emails per campaign). Stored flat, with one
+``lengths`` entry per parent, these helpers compute per-segment positions,
+sums and running totals without a Python loop over parents.
+"""
+import numpy as np
+
+
+def segment_offsets(lengths):
+    """Index of the first element of each segment in the flat array."""
+    lengths = np.asarray(lengths)
+    offsets = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    return offsets
+
+
+def segment_ids(lengths):
+    """Parent index of every flat element."""
+    return np.repeat(np.arange(len(lengths)), lengths)
+
+
+def segment_positions(lengths):
+    """Position of every flat element within its own segment (0-based)."""
+    lengths = np.asarray(lengths)
+    return np.arange(int(lengths.sum())) - np.repeat(segment_offsets(lengths), lengths)
+
+
+def segment_sum(values, lengths):
+    """Sum of ``values`` over each segment; every segment must be non-empty."""
+    return np.add.reduceat(values, segment_offsets(lengths))
+
+
+def segment_cumsum(values, lengths):
+    """Running total of ``values`` that restarts at the beginning of each segment."""
+    lengths = np.asarray(lengths)
+    totals = np.cumsum(values)
+    offsets = segment_offsets(lengths)[lengths > 0]
+    restart = totals[offsets] - np.asarray(values)[offsets]
+    return totals - np.repeat(restart, lengths[lengths > 0])
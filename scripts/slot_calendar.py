@@ -0,0 +1,118 @@
+"""Conflict-free booking of fixed-length time slots for staff calendars.
+
+Drawing a provider, a date and a clock time independently for every
+appointment double-books providers as soon as there are more appointments
+than a handful per provider-day. ``SlotCalendar`` keeps one ``uint64``
+bitmap per (staff member, day) with a set bit for every slot that is still
+bookable (24 hours of 30-minute slots fit in 48 bits). Availability windows
+such as shifts are just bitmaps built with ``hours_mask``.
+
+``book`` places a whole batch of requests at once: requests are grouped by
+(staff, day) cell, and the r-th request of every cell takes a random slot
+among those still free after the first r. The pick is vectorized over all
+cells: each bitmap is unpacked into 64 bits, a random rank below its
+popcount is drawn, and the slot is the first bit whose running count passes
+that rank. Requests whose cell is full come back unbooked; ``schedule``
+moves them to other days for the same staff member and finally to any cell
+with room.
+"""
+import numpy as np
+
+from segments import segment_positions
+
+
+def hours_mask(start_hour, end_hour, slot_minutes=30):
+    """Bitmap of the slots from ``start_hour`` up to (not including) ``end_hour``."""
+    first = int(start_hour * 60) // slot_minutes
+    last = int(end_hour * 60) // slot_minutes
+    return sum(1 << slot for slot in range(first, last))
+
+
+class SlotCalendar:
+    """
+    Bookable slots per staff member and day.
+
+    Args:
+        availability: (staff x days) array of bitmaps, bit i set when slot i of that
+            day is within the staff member's working hours
+        slot_minutes: Length of one slot; a day must fit in 64 slots
+    """
+
+    def __init__(self, availability, slot_minutes=30):
+        if 24 * 60 // slot_minutes > 64:
+            raise ValueError(f"{slot_minutes}-minute slots don't fit a day in 64 bits")
+        self.free = np.array(availability, dtype=np.uint64)
+        self.n_staff, self.n_days = self.free.shape
+        self.slot_minutes = slot_minutes
+
+    def free_slots(self):
+        """Number of slots still bookable."""
+        return int(np.unpackbits(self.free.view(np.uint8)).sum())
+
+    def book(self, rng, staff, day):
+        """
+        Book one random free slot for each (staff, day) request.
+
+        Returns:
+            np.ndarray: Slot index of every request, -1 where its staff member had no free slot that day
+        """
+        cells = np.asarray(staff, dtype=np.int64) * self.n_days + np.asarray(day, dtype=np.int64)
+        slots = np.full(len(cells), -1, dtype=np.int64)
+        if not len(cells):
+            return slots
+        order = np.argsort(cells, kind='stable')
+        _, counts = np.unique(cells[order], return_counts=True)
+        rank = segment_positions(counts)
+
+        free = self.free.reshape(-1)
+        for r in range(int(rank.max()) + 1):
+            requests = order[rank == r]  # At most one request per cell
+            cell_free = free[cells[requests]]
+            open_cells = cell_free != 0
+            if not open_cells.any():
+                break  # Cells holding later ranks are a subset of these, all full
+            requests, cell_free = requests[open_cells], cell_free[open_cells]
+            # Bit i of each bitmap in column i, and the running count of free slots up to it
+            bits = np.unpackbits(cell_free.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+            running = np.cumsum(bits, axis=1, dtype=np.uint8)
+            pick = (rng.random(len(requests)) * running[:, -1]).astype(np.uint8)
+            slot = np.argmax(running > pick[:, None], axis=1)
+            slots[requests] = slot
+            free[cells[requests]] = cell_free & ~(np.uint64(1) << slot.astype(np.uint64))
+        return slots
+
+    def schedule(self, rng, staff, day, day_retries=3):
+        """
+        Book every request, moving requests that don't fit to other days or staff.
+
+        A request whose cell is full first retries up to ``day_retries`` random
+        days for the same staff member, then goes to a random (staff, day) cell
+        that still has a free slot.
+
+        Returns:
+            tuple: (staff, day, slot) arrays of the bookings, in request order
+        """
+        staff = np.array(staff, dtype=np.int64)
+        day = np.array(day, dtype=np.int64)
+        if len(staff) > self.free_slots():
+            raise ValueError(f"{len(staff)} appointments requested but only {self.free_slots()} slots are free")
+        slot = self.book(rng, staff, day)
+        for _ in range(day_retries):
+            pending = np.flatnonzero(slot < 0)
+            if not len(pending):
+                break
+            day[pending] = rng.integers(0, self.n_days, len(pending))
+            slot[pending] = self.book(rng, staff[pending], day[pending])
+
+        pending = np.flatnonzero(slot < 0)
+        while len(pending):
+            open_cells = np.flatnonzero(self.free.reshape(-1))
+            cells = open_cells[rng.integers(0, len(open_cells), len(pending))]
+            staff[pending], day[pending] = np.divmod(cells, self.n_days)
+            slot[pending] = self.book(rng, staff[pending], day[pending])
+            pending = pending[slot[pending] < 0]
+        return staff, day, slot
+
+    def minutes(self, slot):
+        """Start of each slot in minutes after midnight."""
+        return np.asarray(slot) * self.slot_minutes
@@ -0,0 +1,97 @@
+"""Bulk free-text columns: compiled templates and pre-generated sentence pools.
+
+Note columns are usually either a template filled from other columns of the
+same row ("{subcategory} due to {mechanism}.") or filler prose from Faker.
+Doing either per row dominates generation time at millions of rows.
+
+``TextTemplate`` parses a ``str.format`` template once into literal pieces
+and slot names, then fills a whole column by concatenating column arrays.
+``fill_templates`` does the same when each row picks one of several
+templates. ``corpus_pool`` generates a fixed, seeded pool of Faker sentences
+once and returns a ``CategoricalSampler`` over it, so every later draw is an
+O(1) lookup instead of a call into Faker.
+"""
+from string import Formatter
+
+import numpy as np
+from faker import Faker
+
+from samplers import CategoricalSampler
+
+
+class TextTemplate:
+    """
+    A ``str.format`` template compiled into literal pieces and named slots.
+
+    Args:
+        template: Template text with ``{name}`` slots (no format specs or conversions)
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.literals = []
+        self.slots = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if spec or conversion:
+                raise ValueError(f"Format specs and conversions aren't supported: {template!r}")
+            self.literals.append(literal)
+            if field is not None:
+                self.slots.append(field)
+        if len(self.literals) == len(self.slots):
+            self.literals.append('')
+
+    def fill(self, columns, rows=slice(None)):
+        """
+        Fill the template for many rows at once.
+
+        Args:
+            columns: Mapping of slot name to a column of values (converted with str)
+            rows: Optional mask or index selecting the rows to fill
+
+        Returns:
+            np.ndarray: Object array of filled strings
+        """
+        if not self.slots:
+            # Constant text; any column tells how many rows were selected
+            n = len(np.asarray(next(iter(columns.values())))[rows])
+            return np.full(n, self.literals[0], dtype=object)
+        text = None
+        for literal, slot in zip(self.literals, self.slots):
+            values = np.asarray(columns[slot])[rows].astype(str).astype(object)
+            text = literal + values if text is None else text + literal + values
+        return text + self.literals[-1] if self.literals[-1] else text
+
+
+def fill_templates(templates, template_indices, columns):
+    """
+    Fill one of several templates per row.
+
+    Args:
+        templates: List of TextTemplate (or template strings)
+        template_indices: Index into ``templates`` for every row
+        columns: Mapping of slot name to a column of values
+
+    Returns:
+        np.ndarray: Object array of filled strings
+    """
+    templates = [t if isinstance(t, TextTemplate) else TextTemplate(t) for t in templates]
+    template_indices = np.asarray(template_indices)
+    text = np.empty(len(template_indices), dtype=object)
+    for i, template in enumerate(templates):
+        rows = template_indices == i
+        if rows.any():
+            text[rows] = template.fill(columns, rows)
+    return text
+
+
+def corpus_pool(method='sentence', size=2000, seed=42, **kwargs):
+    """
+    Sampler over ``size`` pre-generated Faker texts, e.g. ``corpus_pool('text', max_nb_chars=100)``.
+
+    The pool comes from its own Faker instance seeded with ``seed``, so it is
+    the same on every run and doesn't consume the caller's Faker stream.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    make_text = getattr(fake, method)
+    return CategoricalSampler([make_text(**kwargs) for _ in range(size)])
@@ -0,0 +1,76 @@
+"""Typed struct-of-arrays tables handed from parent to child generators.
+
+Entity generators (accounts, contacts, opportunities) feed child tables that
+need their ids, amounts and dates. Passing those as lists of dicts with
+pre-formatted date strings forces every child to ``strptime`` them back. A
+``Table`` instead keeps one NumPy array per column, with dates stored as
+integer day numbers (days since 1970-01-01, the int value of datetime64[D]),
+so children can compare and offset dates with plain integer arithmetic.
+Values are only turned into strings at the CSV sink, via ``column_blocks``.
+"""
+from datetime import date
+
+import numpy as np
+
+from calendar_strings import format_dates
+
+# Day number of a missing date; equal to NaT when viewed as datetime64[D]
+NO_DATE = np.iinfo(np.int64).min
+
+
+def day_number(value):
+    """Day number of a date (or ISO date string)."""
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+def today_day_number():
+    return day_number(date.today())
+
+
+def format_days(days):
+    """ISO date strings for an array of day numbers; missing dates become ''."""
+    return format_dates(np.asarray(days, dtype=np.int64))
+
+
+class Table:
+    """
+    Columns of equal length, one array per column.
+
+    Args:
+        columns: Mapping of column name to a sequence of values
+        date_columns: Names of columns holding day numbers, formatted as ISO dates on output
+    """
+
+    def __init__(self, columns, date_columns=()):
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Table columns have different lengths: {sorted(lengths)}")
+        self.date_columns = set(date_columns)
+        self.length = lengths.pop() if lengths else 0
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def select(self, index):
+        """Rows picked by a boolean mask or an array of row indices, as a new Table."""
+        return Table({name: values[index] for name, values in self.columns.items()}, self.date_columns)
+
+    def formatted(self, name, rows=slice(None)):
+        """Output values of one column (for ``rows``) as a list, dates rendered as ISO strings."""
+        values = self.columns[name][rows]
+        if name in self.date_columns:
+            return format_days(values).tolist()
+        return values.tolist()
+
+    def column_blocks(self, fieldnames, block_size=100_000):
+        """Yield the table as blocks of formatted columns in ``fieldnames`` order."""
+        for start in range(0, self.length, block_size):
+            rows = slice(start, min(start + block_size, self.length))
+            yield [self.formatted(name, rows) for name in fieldnames]